@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+REPLICA = 'replica'
+PRIMARY = 'default'
+
+read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def use_primary(view):
+    view.use_primary = True
+    return view
+
+
+@contextmanager
+def read_from_primary():
+    token = read_from_replica.set(False)
+    try:
+        yield
+    finally:
+        read_from_replica.reset(token)
+
+
+def request_health_checks():
+    for connection in connections.all():
+        if connection.settings_dict.get('CONN_HEALTH_CHECKS'):
+            connection.health_check_pending = True
+
+
+class HealthCheckMixin:
+    health_check_pending = False
+
+    def ensure_connection(self):
+        if self.health_check_pending:
+            self.health_check_pending = False
+            if (self.connection is not None
+                    and not self.in_atomic_block
+                    and not self.is_usable()):
+                self.close()
+        super().ensure_connection()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if read_from_replica.get() and REPLICA in settings.DATABASES:
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        read_from_replica.set(False)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db == REPLICA:
+            return False
+        return None
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .db import read_from_replica, request_health_checks
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDERS_RE = re.compile(r'\((?:%s, )*%s\)')
+NUMBERS_RE = re.compile(r'\b\d+\b')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(sql):
+    sql = NUMBERS_RE.sub('?', PLACEHOLDERS_RE.sub('(...)', sql))
+    return hashlib.md5(sql.encode()).hexdigest()[:12], sql
+
+
+class QueryProfile:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+        self.view_started = None
+        self.view_duration = 0
+        self.render_duration = 0
+        self.fingerprints = Counter()
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            key, statement = fingerprint(sql)
+            self.fingerprints[key] += 1
+            self.statements.setdefault(key, statement)
+
+    def start_view(self):
+        self.view_started = (time.perf_counter(), self.duration)
+
+    def finish_view(self):
+        if self.view_started is None:
+            return
+        started, db_duration = self.view_started
+        self.view_duration = (
+            time.perf_counter() - started - (self.duration - db_duration)
+        )
+        self.view_started = None
+
+    def duplicates(self):
+        return [
+            {'fingerprint': key, 'count': count,
+             'sql': self.statements[key][:200]}
+            for key, count in self.fingerprints.most_common()
+            if count > 1
+        ]
+
+
+class SQLProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.is_enabled(request):
+            return self.get_response(request)
+
+        profile = request._sql_profile = QueryProfile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+        profile.finish_view()
+        duration = time.perf_counter() - started
+
+        response['Server-Timing'] = (
+            f'db;dur={profile.duration * 1000:.1f};'
+            f'desc="{profile.count} queries", '
+            f'view;dur={profile.view_duration * 1000:.1f};'
+            f'desc="serialization", '
+            f'render;dur={profile.render_duration * 1000:.1f};desc="JSON", '
+            f'total;dur={duration * 1000:.1f}'
+        )
+        self.report(request, response, profile, duration)
+        return response
+
+    def is_enabled(self, request):
+        if settings.SQL_PROFILING:
+            return True
+        return (
+            settings.SQL_PROFILING_ALLOW_HEADER
+            and request.META.get('HTTP_X_PROFILE_SQL') == '1'
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, '_sql_profile'):
+            view = getattr(view_func, 'cls', view_func)
+            request._query_budget = getattr(
+                view, 'query_budget', settings.SQL_QUERY_BUDGET
+            )
+            request._sql_profile.start_view()
+
+    def process_template_response(self, request, response):
+        profile = getattr(request, '_sql_profile', None)
+        if profile is not None:
+            profile.finish_view()
+            started = time.perf_counter()
+
+            def rendered(response):
+                profile.render_duration = time.perf_counter() - started
+            response.add_post_render_callback(rendered)
+        return response
+
+    def report(self, request, response, profile, duration):
+        data = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.count,
+            'db_ms': round(profile.duration * 1000, 1),
+            'view_ms': round(profile.view_duration * 1000, 1),
+            'render_ms': round(profile.render_duration * 1000, 1),
+            'total_ms': round(duration * 1000, 1),
+            'duplicates': profile.duplicates(),
+        }
+        logger.info(json.dumps(data, ensure_ascii=False))
+
+        budget = getattr(request, '_query_budget', settings.SQL_QUERY_BUDGET)
+        if budget and profile.count > budget:
+            message = (
+                f'{request.method} {request.path}: {profile.count} '
+                f'запросов при бюджете {budget}'
+            )
+            if settings.SQL_QUERY_BUDGET_RAISE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+
+class DatabaseRoutingMiddleware:
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_health_checks()
+        token = read_from_replica.set(False)
+        try:
+            return self.get_response(request)
+        finally:
+            read_from_replica.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in self.safe_methods:
+            return
+        actions = getattr(view_func, 'actions', None) or {}
+        view = getattr(view_func, 'cls', None)
+        action = getattr(view, actions.get(request.method.lower(), ''), None)
+        if not getattr(action, 'use_primary', False):
+            read_from_replica.set(True)
@@ -23,10 +23,12 @@ INSTALLED_APPS = [
     'djoser',
 
     'users',
-    'recipes',
+    'recipes.apps.RecipesConfig',
 ]
 
 MIDDLEWARE = [
+    'foodgram.middleware.SQLProfilingMiddleware',
+    'foodgram.middleware.DatabaseRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -36,6 +38,29 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+SQL_PROFILING = os.environ.get('SQL_PROFILING', '') == '1'
+SQL_PROFILING_ALLOW_HEADER = (
+    os.environ.get('SQL_PROFILING_ALLOW_HEADER', '') == '1'
+)
+SQL_QUERY_BUDGET = int(os.environ.get('SQL_QUERY_BUDGET', 0))
+SQL_QUERY_BUDGET_RAISE = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'foodgram.middleware': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 ROOT_URLCONF = 'foodgram.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -60,15 +85,69 @@ WSGI_APPLICATION = 'foodgram.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': os.environ.get('DB_ENGINE'),
-        'NAME': os.environ.get('DB_NAME'),
+        'ENGINE': os.environ.get(
+            'DB_ENGINE', 'django.db.backends.sqlite3'
+        ),
+        'NAME': os.environ.get(
+            'DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
         'USER': os.environ.get('POSTGRES_USER'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': (
+            os.environ.get('CONN_HEALTH_CHECKS', '1') == '1'
+        ),
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.environ.get('DB_POOLER', '') == 'pgbouncer'
+        ),
+    }
+}
+
+if DATABASES['default']['ENGINE'] in (
+    'django.db.backends.postgresql', 'django.db.backends.postgresql_psycopg2'
+):
+    DATABASES['default']['ENGINE'] = 'foodgram.backends.postgresql'
+
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ.get('DB_REPLICA_HOST'),
+        'PORT': os.environ.get(
+            'DB_REPLICA_PORT', DATABASES['default']['PORT']
+        ),
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+
+DATABASE_ROUTERS = ['foodgram.db.ReplicaRouter']
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+
+MEMBERSHIPS_CACHE_TIMEOUT = int(
+    os.environ.get('MEMBERSHIPS_CACHE_TIMEOUT', 300)
+)
+
+RECIPE_MATCH_MAX_INGREDIENTS = 100
+RECIPE_MATCH_MAX_CHANGES = 100
+RECIPE_MATCH_CHANGES_TIMEOUT = 3600
+
+POPULAR_RECIPES_LIMIT = 100
+POPULAR_WINDOW_DAYS = 30
+POPULAR_HALF_LIFE_HOURS = 72
+POPULAR_REFRESH_INTERVAL = int(os.environ.get('POPULAR_REFRESH_INTERVAL', 0))
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -103,6 +182,19 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 6
 }
 
+RECIPES_LIMIT_MAX = 100
+
+BULK_RECIPES_MAX = 100
+
+FEED_AUTHORS_MAX = int(os.environ.get('FEED_AUTHORS_MAX', 500))
+
+PAGINATION_COUNT_CACHE_TIMEOUT = int(
+    os.environ.get('PAGINATION_COUNT_CACHE_TIMEOUT', 60)
+)
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = int(
+    os.environ.get('PAGINATION_COUNT_ESTIMATE_THRESHOLD', 100000)
+)
+
 
 DJOSER = {
     'LOGIN_FIELD': 'email',
@@ -129,6 +221,17 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+IMAGE_RENDITION_QUALITY = 80
+
+RECIPE_IMAGE_MAX_BYTES = int(
+    os.environ.get('RECIPE_IMAGE_MAX_BYTES', 5 * 1024 * 1024)
+)
+RECIPE_IMAGE_MAX_PIXELS = int(
+    os.environ.get('RECIPE_IMAGE_MAX_PIXELS', 25 * 1000 * 1000)
+)
+RECIPE_REQUEST_MAX_BYTES = RECIPE_IMAGE_MAX_BYTES * 4 // 3 + 1024 * 1024
+
 AUTH_USER_MODEL = 'users.CustomUser'
 
 AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
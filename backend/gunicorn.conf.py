@@ -0,0 +1,26 @@
+import multiprocessing
+import os
+
+wsgi_app = os.environ.get('GUNICORN_APP', 'foodgram.wsgi:application')
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+# Кэш в памяти процесса не общий для воркеров: версии кэша и индексы
+# разойдутся, поэтому без общего кэша по умолчанию запускается один воркер.
+shared_cache = 'locmem' not in os.environ.get('CACHE_BACKEND', 'locmem')
+workers = int(os.environ.get(
+    'GUNICORN_WORKERS',
+    multiprocessing.cpu_count() * 2 + 1 if shared_cache else 1,
+))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
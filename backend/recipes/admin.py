@@ -1,7 +1,9 @@
 from django.contrib import admin
 
+from .images import schedule_renditions
 from .models import (Favorites, Follow, Ingredient, IngredientInRecipe,
                      Purchase, Recipe, Tag)
+from .search import update_search_document
 
 
 class IngredientAdmin(admin.ModelAdmin):
@@ -15,7 +17,7 @@ class IngredientInRecipeAdmin(admin.TabularInline):
 
 
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('author', 'name', 'favorited')
+    list_display = ('author', 'name', 'favorites_count')
     list_filter = ('author', 'name', 'tags')
     exclude = ('ingredients',)
 
@@ -23,11 +25,17 @@ class RecipeAdmin(admin.ModelAdmin):
         IngredientInRecipeAdmin,
     ]
 
-    def favorited(self, obj):
-        favorited_count = Favorites.objects.filter(recipe=obj).count()
-        return favorited_count
-
-    favorited.short_description = 'В избранном'
+    def save_model(self, request, obj, form, change):
+        image_changed = 'image' in form.changed_data
+        if image_changed:
+            obj.renditions_ready = False
+        super().save_model(request, obj, form, change)
+        if image_changed:
+            schedule_renditions(obj)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        update_search_document(form.instance)
 
 
 class TagAdmin(admin.ModelAdmin):
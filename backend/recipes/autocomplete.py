@@ -0,0 +1,65 @@
+import bisect
+import difflib
+import threading
+
+from foodgram.db import read_from_primary
+
+from .cache import INGREDIENTS_VERSION, get_version
+from .models import Ingredient
+
+PREFIX = 'prefix'
+CONTAINS = 'contains'
+FUZZY = 'fuzzy'
+SEARCH_MODES = (PREFIX, CONTAINS, FUZZY)
+
+
+def normalize(value):
+    return value.casefold().replace('ё', 'е').strip()
+
+
+class IngredientIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = (None, [], [])
+
+    def _load(self, version):
+        items = sorted(
+            Ingredient.objects.values('id', 'name', 'measurement_unit'),
+            key=lambda item: (normalize(item['name']), item['id']),
+        )
+        keys = [normalize(item['name']) for item in items]
+        self._snapshot = (version, keys, items)
+
+    def get_snapshot(self):
+        version = get_version(INGREDIENTS_VERSION)
+        if self._snapshot[0] != version:
+            with self._lock:
+                if self._snapshot[0] != version:
+                    with read_from_primary():
+                        self._load(version)
+        return self._snapshot
+
+    def search(self, query, mode=PREFIX):
+        _, keys, items = self.get_snapshot()
+        query = normalize(query)
+        start = bisect.bisect_left(keys, query)
+        end = bisect.bisect_left(keys, query + '\U0010ffff', start)
+        results = items[start:end]
+        if mode == PREFIX:
+            return results
+
+        results.extend(
+            item for key, item in zip(keys, items)
+            if query in key and not key.startswith(query)
+        )
+        if mode == FUZZY and not results:
+            for match in difflib.get_close_matches(
+                query, set(keys), n=20, cutoff=0.6
+            ):
+                start = bisect.bisect_left(keys, match)
+                end = bisect.bisect_right(keys, match, start)
+                results.extend(items[start:end])
+        return results
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,74 @@
+from django.db import router, transaction
+from django.db.models import Exists, OuterRef
+
+from .cache import COUNTS_VERSION, bump_versions_on_commit
+from .counters import change_favorites_count
+from .memberships import invalidate_memberships
+from .models import Favorites, Recipe
+
+ADDED = 'added'
+ALREADY_ADDED = 'already_added'
+REMOVED = 'removed'
+NOT_FOUND = 'not_found'
+
+
+def relations_added(model, user, recipe_ids):
+    if not recipe_ids:
+        return
+    if model is Favorites:
+        change_favorites_count(recipe_ids, 1)
+    bump_versions_on_commit(COUNTS_VERSION)
+    invalidate_memberships(user.id)
+
+
+def relations_removed(model, user, recipe_ids):
+    if not recipe_ids:
+        return
+    if model is Favorites:
+        change_favorites_count(recipe_ids, -1)
+    bump_versions_on_commit(COUNTS_VERSION)
+    invalidate_memberships(user.id)
+
+
+@transaction.atomic
+def bulk_add(model, user, recipe_ids):
+    present = dict(Recipe.objects.filter(id__in=recipe_ids).annotate(
+        added=Exists(model.objects.filter(user=user, recipe=OuterRef('pk')))
+    ).values_list('id', 'added'))
+    added = [id for id, is_added in present.items() if not is_added]
+    model.objects.bulk_create(
+        (model(user=user, recipe_id=id) for id in added),
+        ignore_conflicts=True,
+    )
+    relations_added(model, user, added)
+
+    outcomes = {}
+    for id in recipe_ids:
+        if id not in present:
+            outcomes[id] = NOT_FOUND
+        elif present[id]:
+            outcomes[id] = ALREADY_ADDED
+        else:
+            outcomes[id] = ADDED
+    return outcomes
+
+
+@transaction.atomic
+def bulk_remove(model, user, recipe_ids=None):
+    relations = model.objects.filter(user=user)
+    if recipe_ids is not None:
+        relations = relations.filter(recipe_id__in=recipe_ids)
+    removed = set(relations.select_for_update().values_list(
+        'recipe_id', flat=True
+    ))
+    if removed:
+        model.objects.filter(
+            user=user, recipe_id__in=removed
+        )._raw_delete(router.db_for_write(model))
+    relations_removed(model, user, removed)
+
+    if recipe_ids is None:
+        recipe_ids = sorted(removed)
+    return {
+        id: REMOVED if id in removed else NOT_FOUND for id in recipe_ids
+    }
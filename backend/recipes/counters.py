@@ -0,0 +1,48 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .cache import (RECIPE_VERSION, RECIPES_RELATED_VERSION, RECIPES_VERSION,
+                    bump_versions_on_commit)
+from .models import Favorites, Follow, Recipe, User
+
+
+def increment(queryset, field, delta=1):
+    if delta > 0:
+        return queryset.update(**{field: F(field) + delta})
+    return queryset.filter(**{f'{field}__gte': -delta}).update(
+        **{field: F(field) + delta}
+    )
+
+
+def change_favorites_count(recipe_ids, delta):
+    increment(
+        Recipe.objects.filter(id__in=recipe_ids), 'favorites_count', delta
+    )
+    bump_versions_on_commit(RECIPES_VERSION, *(
+        RECIPE_VERSION.format(id) for id in recipe_ids
+    ))
+
+
+def change_author_count(author_id, field, delta):
+    increment(User.objects.filter(pk=author_id), field, delta)
+    bump_versions_on_commit(RECIPES_VERSION, RECIPES_RELATED_VERSION)
+
+
+def count_subquery(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(
+            **{field: OuterRef('pk')}
+        ).order_by().values(field).annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0)
+
+
+def recount():
+    Recipe.objects.update(
+        favorites_count=count_subquery(Favorites.objects.all(), 'recipe')
+    )
+    User.objects.update(
+        recipes_count=count_subquery(Recipe.objects.all(), 'author'),
+        followers_count=count_subquery(Follow.objects.all(), 'author'),
+    )
@@ -0,0 +1,79 @@
+import base64
+import binascii
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from PIL import Image
+from rest_framework import serializers
+
+IMAGE_EXTENSIONS = {
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'GIF': 'gif',
+    'WEBP': 'webp',
+}
+DECODE_CHUNK_SIZE = 64 * 1024
+
+
+class StreamingImageField(serializers.ImageField):
+    default_error_messages = {
+        'invalid_base64': 'Некорректное изображение в base64.',
+        'too_large': 'Размер изображения превышает {max_bytes} байт.',
+        'too_many_pixels': 'Изображение больше {max_pixels} пикселей.',
+        'invalid_type': 'Поддерживаемые форматы изображений: '
+                        'JPEG, PNG, GIF, WEBP.',
+    }
+
+    def to_internal_value(self, data):
+        if data in ('', None):
+            if self.root.instance is None:
+                self.fail('required')
+            return None
+        if isinstance(data, str):
+            data = self.decode(data)
+        elif not hasattr(data, 'read'):
+            self.fail('invalid')
+        elif data.size > settings.RECIPE_IMAGE_MAX_BYTES:
+            self.fail('too_large', max_bytes=settings.RECIPE_IMAGE_MAX_BYTES)
+        extension = self.check_image(data)
+        data.name = f'{uuid.uuid4()}.{extension}'
+        return super().to_internal_value(data)
+
+    def decode(self, data):
+        content_type = None
+        if ';base64,' in data:
+            header, data = data.split(';base64,', 1)
+            content_type = header.replace('data:', '')
+        max_bytes = settings.RECIPE_IMAGE_MAX_BYTES
+        if len(data) > (max_bytes + 2) // 3 * 4:
+            self.fail('too_large', max_bytes=max_bytes)
+
+        file = TemporaryUploadedFile('image', content_type, 0, None)
+        try:
+            for start in range(0, len(data), DECODE_CHUNK_SIZE):
+                file.write(base64.b64decode(
+                    data[start:start + DECODE_CHUNK_SIZE], validate=True
+                ))
+        except (binascii.Error, ValueError):
+            file.close()
+            self.fail('invalid_base64')
+        file.size = file.tell()
+        file.seek(0)
+        return file
+
+    def check_image(self, file):
+        try:
+            image = Image.open(file)
+        except (OSError, Image.DecompressionBombError):
+            self.fail('invalid_image')
+        width, height = image.size
+        if width * height > settings.RECIPE_IMAGE_MAX_PIXELS:
+            self.fail(
+                'too_many_pixels',
+                max_pixels=settings.RECIPE_IMAGE_MAX_PIXELS,
+            )
+        if image.format not in IMAGE_EXTENSIONS:
+            self.fail('invalid_type')
+        file.seek(0)
+        return IMAGE_EXTENSIONS[image.format]
@@ -1,6 +1,48 @@
 import django_filters as filters
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
 
-from .models import Ingredient, Recipe, User
+from foodgram.db import read_from_primary
+
+from .cache import TAGS_VERSION, get_version
+from .models import Ingredient, Recipe, Tag, User
+from .search import search_recipes
+
+TAG_IDS_KEY = 'tag-ids:{}'
+
+TAGS_ANY = 'any'
+TAGS_ALL = 'all'
+TAGS_MODES = (
+    (TAGS_ANY, 'Хотя бы один из тегов'),
+    (TAGS_ALL, 'Все теги'),
+)
+
+
+def get_tag_ids():
+    key = TAG_IDS_KEY.format(get_version(TAGS_VERSION))
+    tag_ids = cache.get(key)
+    if tag_ids is None:
+        with read_from_primary():
+            tag_ids = dict(Tag.objects.values_list('slug', 'id'))
+        cache.set(key, tag_ids, settings.RESPONSE_CACHE_TIMEOUT)
+    return tag_ids
+
+
+def filter_by_tags(queryset, tag_ids, match_all=False):
+    recipe_tags = Recipe.tags.through.objects.filter(recipe_id=OuterRef('pk'))
+    if match_all:
+        for id in tag_ids:
+            queryset = queryset.filter(Exists(recipe_tags.filter(tag_id=id)))
+        return queryset
+    return queryset.filter(Exists(recipe_tags.filter(tag_id__in=tag_ids)))
+
+
+class TagSlugsFilter(filters.MultipleChoiceFilter):
+    @property
+    def field(self):
+        self.extra['choices'] = [(slug, slug) for slug in get_tag_ids()]
+        return super().field
 
 
 class IngredientNameFilter(filters.FilterSet):
@@ -12,13 +54,28 @@ class IngredientNameFilter(filters.FilterSet):
 
 
 class RecipeFilter(filters.FilterSet):
-    tags = filters.AllValuesMultipleFilter(
-        field_name='tags__slug'
+    tags = TagSlugsFilter(method='filter_tags')
+    tags_mode = filters.ChoiceFilter(
+        choices=TAGS_MODES, method='filter_tags_mode'
     )
     author = filters.ModelChoiceFilter(
         queryset=User.objects.all()
     )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Recipe
-        fields = ['tags', 'author']
+        fields = ['tags', 'tags_mode', 'author', 'search']
+
+    def filter_tags(self, queryset, name, value):
+        tag_ids = get_tag_ids()
+        ids = sorted({tag_ids[slug] for slug in value if slug in tag_ids})
+        return filter_by_tags(
+            queryset, ids, self.form.cleaned_data.get('tags_mode') == TAGS_ALL
+        )
+
+    def filter_tags_mode(self, queryset, name, value):
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
@@ -0,0 +1,139 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from .cache import RECIPE_VERSION, RECIPES_VERSION, bump_versions_on_commit
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS = {
+    'thumbnail': (160, 160),
+    'card': (480, 480),
+    'full': (1280, 1280),
+}
+RENDITION_FORMATS = {
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def rendition_name(image_name, rendition, extension):
+    directory, filename = os.path.split(image_name)
+    base = os.path.splitext(filename)[0]
+    return os.path.join(
+        directory, 'renditions', base, f'{rendition}.{extension}'
+    )
+
+
+def rendition_names(image_name):
+    return {
+        rendition: {
+            extension: rendition_name(image_name, rendition, extension)
+            for extension in RENDITION_FORMATS
+        }
+        for rendition in RENDITIONS
+    }
+
+
+def rendition_urls(recipe, request=None):
+    if not recipe.renditions_ready:
+        return None
+    urls = {}
+    for rendition, names in rendition_names(recipe.image.name).items():
+        urls[rendition] = {}
+        for extension, name in names.items():
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[rendition][extension] = url
+    return urls
+
+
+def flatten(image):
+    if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render(image, size, image_format):
+    rendition = image.copy()
+    rendition.thumbnail(size, Image.LANCZOS)
+    buffer = io.BytesIO()
+    rendition.save(
+        buffer, image_format, quality=settings.IMAGE_RENDITION_QUALITY
+    )
+    return ContentFile(buffer.getvalue())
+
+
+def generate_renditions(recipe_id, image_name):
+    with default_storage.open(image_name) as original:
+        image = flatten(ImageOps.exif_transpose(Image.open(original)))
+    for rendition, size in RENDITIONS.items():
+        for extension, image_format in RENDITION_FORMATS.items():
+            name = rendition_name(image_name, rendition, extension)
+            default_storage.delete(name)
+            default_storage.save(name, render(image, size, image_format))
+
+    updated = Recipe.objects.filter(
+        id=recipe_id, image=image_name
+    ).update(renditions_ready=True)
+    if updated:
+        bump_versions_on_commit(
+            RECIPES_VERSION, RECIPE_VERSION.format(recipe_id)
+        )
+    return updated
+
+
+def run_renditions(recipe_id, image_name):
+    try:
+        generate_renditions(recipe_id, image_name)
+    except Exception:
+        logger.exception(
+            'Не удалось подготовить изображения рецепта %s', recipe_id
+        )
+
+
+def run_renditions_in_worker(recipe_id, image_name):
+    try:
+        run_renditions(recipe_id, image_name)
+    finally:
+        connections.close_all()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                thread_name_prefix='renditions',
+            )
+    return _executor
+
+
+def schedule_renditions(recipe):
+    recipe_id, image_name = recipe.id, recipe.image.name
+
+    def submit():
+        if settings.IMAGE_WORKERS:
+            get_executor().submit(
+                run_renditions_in_worker, recipe_id, image_name
+            )
+        else:
+            run_renditions(recipe_id, image_name)
+    transaction.on_commit(submit)
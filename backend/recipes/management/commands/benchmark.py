@@ -0,0 +1,195 @@
+import json
+import os
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, Tag, User
+
+DEFAULT_OUTPUT = os.path.join(settings.BASE_DIR, 'benchmarks')
+
+
+def get_scenarios(recipe):
+    tags = list(Tag.objects.values_list('slug', flat=True)[:2])
+    tags_query = '&'.join(f'tags={slug}' for slug in tags)
+    ingredient = Ingredient.objects.order_by('id').first()
+    prefix = ingredient.name[:3] if ingredient else 'мол'
+    word = recipe.name.split()[0] if recipe else 'суп'
+    return {
+        'recipes': '/api/recipes/',
+        'recipes page 10': '/api/recipes/?page=10',
+        'recipes cursor': '/api/recipes/?pagination=cursor',
+        'recipes tags any': f'/api/recipes/?{tags_query}',
+        'recipes tags all': f'/api/recipes/?{tags_query}&tags_mode=all',
+        'recipes search': f'/api/recipes/?search={word}',
+        'recipes favorited': '/api/recipes/?is_favorited=1',
+        'recipe detail': f'/api/recipes/{recipe.id if recipe else 1}/',
+        'subscriptions': '/api/users/subscriptions/?recipes_limit=3',
+        'feed': '/api/recipes/feed/',
+        'popular': '/api/recipes/popular/',
+        'shopping cart txt': '/api/recipes/download_shopping_cart/',
+        'ingredients prefix': f'/api/ingredients/?name={prefix}',
+        'ingredients fuzzy': f'/api/ingredients/?name={prefix}&search=fuzzy',
+    }
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Измеряет задержку и число запросов к БД для основных '
+            'эндпоинтов API и сохраняет результаты для сравнения')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--user', help='email пользователя, от имени которого идут запросы'
+        )
+        parser.add_argument(
+            '--only', action='append', default=[],
+            help='Запустить только указанные сценарии',
+        )
+        parser.add_argument('--output', default=DEFAULT_OUTPUT)
+        parser.add_argument(
+            '--compare', help='Файл с прошлыми результатами для сравнения'
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должен быть больше 0')
+        user = self.get_user(options['user'])
+        client = APIClient()
+        client.force_authenticate(user)
+
+        scenarios = get_scenarios(Recipe.objects.order_by('-id').first())
+        if options['only']:
+            scenarios = {
+                name: url for name, url in scenarios.items()
+                if name in options['only']
+            }
+
+        results = {}
+        for name, url in scenarios.items():
+            results[name] = self.measure(
+                client, url, options['warmup'], options['iterations']
+            )
+            self.stdout.write(self.format_result(name, results[name]))
+
+        report = {
+            'revision': git_revision(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'vendor': connection.vendor,
+            'recipes': Recipe.objects.count(),
+            'iterations': options['iterations'],
+            'results': results,
+        }
+        path = self.save(report, options['output'])
+        self.stdout.write(self.style.SUCCESS(f'Результаты сохранены в {path}'))
+
+        if options['compare']:
+            self.compare(results, options['compare'])
+
+    def get_user(self, email):
+        if email:
+            user = User.objects.filter(email=email).first()
+            if user is None:
+                raise CommandError(f'Пользователь {email} не найден')
+            return user
+        user = User.objects.annotate(
+            purchases_count=Count('purchases')
+        ).order_by('-purchases_count', 'id').first()
+        if user is None:
+            raise CommandError(
+                'В базе нет пользователей, запустите generate_fake_data'
+            )
+        return user
+
+    def measure(self, client, url, warmup, iterations):
+        for _ in range(warmup):
+            self.request(client, url)
+        timings = []
+        queries = []
+        status = None
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                status = self.request(client, url)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(context.captured_queries))
+        return {
+            'url': url,
+            'status': status,
+            'queries': max(queries),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+        }
+
+    def request(self, client, url):
+        response = client.get(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+    def format_result(self, name, result):
+        return (
+            f'{name:<22} {result["status"]} '
+            f'запросов: {result["queries"]:>3}  '
+            f'p50: {result["p50_ms"]:>8.2f} мс  '
+            f'p95: {result["p95_ms"]:>8.2f} мс'
+        )
+
+    def save(self, report, output):
+        os.makedirs(output, exist_ok=True)
+        name = '-'.join(filter(None, (
+            time.strftime('%Y%m%d-%H%M%S'), report['revision'],
+            report['vendor'],
+        )))
+        path = os.path.join(output, f'{name}.json')
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        return path
+
+    def compare(self, results, path):
+        try:
+            with open(path, encoding='utf-8') as file:
+                previous = json.load(file)['results']
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'Не удалось прочитать {path}: {error}')
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Сравнение с {path}'))
+        for name, result in results.items():
+            if name not in previous:
+                continue
+            before = previous[name]
+            change = (
+                (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+                if before['p50_ms'] else 0
+            )
+            self.stdout.write(
+                f'{name:<22} запросов: {before["queries"]:>3} → '
+                f'{result["queries"]:<3}  p50: {before["p50_ms"]:>8.2f} → '
+                f'{result["p50_ms"]:>8.2f} мс ({change:+.1f}%)'
+            )
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Upper
+
+from recipes.filters import filter_by_tags
+from recipes.models import (Favorites, Ingredient, IngredientInRecipe,
+                            Purchase, Recipe, Tag, User)
+
+
+def hot_queries(user, name):
+    tag_ids = list(Tag.objects.order_by('id').values_list(
+        'id', flat=True
+    )[:2]) or [1, 2]
+    return {
+        'recipe feed': Recipe.objects.order_by('-pub_date', '-id')[:6],
+        'author feed': Recipe.objects.filter(
+            author=user
+        ).order_by('-pub_date')[:6],
+        'tag filter': filter_by_tags(
+            Recipe.objects.all(), tag_ids
+        ).order_by('-pub_date', '-id')[:6],
+        'tag filter all': filter_by_tags(
+            Recipe.objects.all(), tag_ids, match_all=True
+        ).order_by('-pub_date', '-id')[:6],
+        'favorite lookup': Favorites.objects.filter(
+            user=user, recipe_id=1
+        ),
+        'shopping cart': Purchase.objects.filter(
+            user=user
+        ).order_by('-date_added'),
+        'recipe ingredients': IngredientInRecipe.objects.filter(recipe_id=1),
+        'ingredient prefix': Ingredient.objects.annotate(
+            upper_name=Upper('name')
+        ).filter(upper_name__startswith=name.upper()),
+        'ingredient contains': Ingredient.objects.annotate(
+            upper_name=Upper('name')
+        ).filter(upper_name__contains=name.upper()),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Выводит планы выполнения основных запросов API. Запустите до '
+            'и после migrate, чтобы сравнить использование индексов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='EXPLAIN ANALYZE (только PostgreSQL)',
+        )
+        parser.add_argument('--ingredient', default='мол')
+
+    def handle(self, *args, **options):
+        user = User.objects.order_by('id').first() or User(id=1)
+        explain_options = {'analyze': True} if options['analyze'] else {}
+        queries = hot_queries(user, options['ingredient'])
+        for title, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write('')
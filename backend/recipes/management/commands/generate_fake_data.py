@@ -0,0 +1,254 @@
+import io
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from recipes.cache import (COUNTS_VERSION, INGREDIENTS_VERSION,
+                           RECIPE_MATCH_VERSION, RECIPES_RELATED_VERSION,
+                           RECIPES_VERSION, TAGS_VERSION, bump_version)
+from recipes.counters import recount
+from recipes.models import (Favorites, Follow, Ingredient, IngredientInRecipe,
+                            Purchase, Recipe, Tag, User)
+from recipes.popular import rebuild_popular
+from recipes.search import build_search_document
+
+WORDS = (
+    'суп', 'салат', 'пирог', 'каша', 'омлет', 'паста', 'рагу', 'запеканка',
+    'блины', 'котлеты', 'плов', 'борщ', 'сырники', 'лазанья', 'жаркое',
+    'куриный', 'грибной', 'овощной', 'сырный', 'томатный', 'домашний',
+    'быстрый', 'летний', 'острый', 'сладкий', 'пряный', 'лёгкий',
+)
+COLORS = ('#E26C2D', '#49B64E', '#8775D2', '#F5B041', '#3498DB')
+
+
+@contextmanager
+def explicit_dates(*fields):
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def skewed_sample(size, count):
+    count = min(count, size)
+    if count > size // 2:
+        return random.sample(range(size), count)
+    chosen = set()
+    while len(chosen) < count:
+        chosen.add(int(size * random.random() ** 2))
+    return chosen
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, рецептами и '
+            'связями для нагрузочного тестирования')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--tags', type=int, default=10)
+        parser.add_argument(
+            '--ingredients', type=int, default=500,
+            help='Сколько ингредиентов создать, если справочник пуст',
+        )
+        parser.add_argument('--ingredients-per-recipe', type=int, default=6)
+        parser.add_argument('--tags-per-recipe', type=int, default=2)
+        parser.add_argument('--favorites', type=int, default=100000)
+        parser.add_argument('--purchases', type=int, default=10000)
+        parser.add_argument('--follows', type=int, default=10000)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределить даты публикаций и добавлений',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--users и --batch-size должны быть больше 0')
+        random.seed(options['seed'])
+        self.options = options
+        self.batch_size = options['batch_size']
+        self.prefix = f'fake{int(time.time())}'
+        self.now = timezone.now()
+        started = time.monotonic()
+
+        with transaction.atomic(), explicit_dates(
+            Recipe._meta.get_field('pub_date'),
+            Favorites._meta.get_field('date_added'),
+            Purchase._meta.get_field('date_added'),
+        ):
+            user_ids = self.step('Пользователи', self.create_users)
+            tag_ids = self.step('Теги', self.create_tags)
+            ingredients = self.step('Ингредиенты', self.get_ingredients)
+            recipe_ids = self.step(
+                'Рецепты', self.create_recipes, user_ids, tag_ids, ingredients
+            )
+            self.step('Избранное', self.create_relations, Favorites,
+                      user_ids, recipe_ids, options['favorites'])
+            self.step('Покупки', self.create_relations, Purchase,
+                      user_ids, recipe_ids, options['purchases'])
+            self.step('Подписки', self.create_follows, user_ids)
+            self.step('Счётчики', recount)
+
+        for name in (COUNTS_VERSION, INGREDIENTS_VERSION, TAGS_VERSION,
+                     RECIPES_VERSION, RECIPES_RELATED_VERSION,
+                     RECIPE_MATCH_VERSION):
+            bump_version(name)
+        self.step('Популярные рецепты', rebuild_popular)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные созданы за {time.monotonic() - started:.2f} с'
+        ))
+
+    def step(self, title, func, *args):
+        started = time.monotonic()
+        result = func(*args)
+        self.stdout.write(f'{title}: {time.monotonic() - started:.2f} с')
+        return result
+
+    def random_date(self):
+        return self.now - timedelta(
+            seconds=random.randint(0, self.options['days'] * 86400)
+        )
+
+    def insert(self, model, objects):
+        created = 0
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                return created
+            model.objects.bulk_create(batch)
+            created += len(batch)
+
+    def create_users(self):
+        password = make_password(self.prefix)
+        self.insert(User, (
+            User(
+                email=f'{self.prefix}_{i}@example.com',
+                username=f'{self.prefix}_{i}',
+                first_name='Тест',
+                last_name=f'Пользователь {i}',
+                password=password,
+            )
+            for i in range(self.options['users'])
+        ))
+        return list(User.objects.filter(
+            username__startswith=f'{self.prefix}_'
+        ).order_by('id').values_list('id', flat=True))
+
+    def create_tags(self):
+        self.insert(Tag, (
+            Tag(
+                name=f'Тег {i}',
+                color=COLORS[i % len(COLORS)],
+                slug=f'{self.prefix}-{i}',
+            )
+            for i in range(self.options['tags'])
+        ))
+        return list(Tag.objects.filter(
+            slug__startswith=f'{self.prefix}-'
+        ).values_list('id', flat=True))
+
+    def get_ingredients(self):
+        if Ingredient.objects.count() < self.options['ingredients_per_recipe']:
+            self.insert(Ingredient, (
+                Ingredient(name=f'ингредиент {i}', measurement_unit='г')
+                for i in range(self.options['ingredients'])
+            ))
+        return list(Ingredient.objects.values_list('id', 'name'))
+
+    def placeholder_image(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (480, 320), COLORS[0]).save(buffer, 'JPEG')
+        return default_storage.save(
+            f'recipes/{self.prefix}.jpg', ContentFile(buffer.getvalue())
+        )
+
+    def create_recipes(self, user_ids, tag_ids, ingredients):
+        image = self.placeholder_image()
+        per_recipe = min(
+            self.options['ingredients_per_recipe'], len(ingredients)
+        )
+        tags_per_recipe = min(self.options['tags_per_recipe'], len(tag_ids))
+        specs = []
+        for i in range(self.options['recipes']):
+            name = ' '.join(random.sample(WORDS, 2)).capitalize()
+            specs.append((
+                f'{name} {self.prefix}_{i}',
+                random.sample(ingredients, per_recipe),
+                random.sample(tag_ids, tags_per_recipe),
+            ))
+
+        self.insert(Recipe, (
+            Recipe(
+                author_id=random.choice(user_ids),
+                image=image,
+                name=name,
+                text=f'Описание рецепта «{name}».',
+                cooking_time=random.randint(5, 180),
+                pub_date=self.random_date(),
+                search_document=build_search_document(
+                    name, f'Описание рецепта «{name}».',
+                    (ingredient for _, ingredient in recipe_ingredients),
+                ),
+            )
+            for name, recipe_ingredients, _ in specs
+        ))
+        recipe_ids = list(Recipe.objects.filter(
+            name__contains=f' {self.prefix}_'
+        ).order_by('id').values_list('id', flat=True))
+
+        self.insert(IngredientInRecipe, (
+            IngredientInRecipe(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=random.randint(1, 500),
+            )
+            for recipe_id, (_, recipe_ingredients, _) in zip(recipe_ids, specs)
+            for ingredient_id, _ in recipe_ingredients
+        ))
+        self.insert(Recipe.tags.through, (
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id, (_, _, recipe_tags) in zip(recipe_ids, specs)
+            for tag_id in recipe_tags
+        ))
+        return recipe_ids
+
+    def create_relations(self, model, user_ids, recipe_ids, total):
+        per_user, extra = divmod(total, len(user_ids))
+        return self.insert(model, (
+            model(
+                user_id=user_id,
+                recipe_id=recipe_ids[index],
+                date_added=self.random_date(),
+            )
+            for number, user_id in enumerate(user_ids)
+            for index in skewed_sample(
+                len(recipe_ids), per_user + (number < extra)
+            )
+        ))
+
+    def create_follows(self, user_ids):
+        per_user, extra = divmod(self.options['follows'], len(user_ids))
+        return self.insert(Follow, (
+            Follow(user_id=user_id, author_id=user_ids[index])
+            for number, user_id in enumerate(user_ids)
+            for index in skewed_sample(
+                len(user_ids), per_user + (number < extra)
+            )
+            if user_ids[index] != user_id
+        ))
@@ -0,0 +1,53 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from recipes.images import generate_renditions
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Готовит уменьшенные копии изображений рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии и для уже обработанных рецептов',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=max(settings.IMAGE_WORKERS, 1),
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        recipes = Recipe.objects.exclude(image='')
+        if not options['all']:
+            recipes = recipes.filter(renditions_ready=False)
+        recipes = list(recipes.values_list('id', 'image'))
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            results = executor.map(
+                lambda recipe: self.process(*recipe), recipes
+            )
+            for recipe_id, error in results:
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f'Рецепт {recipe_id}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано рецептов: {len(recipes) - failed}, '
+            f'ошибок: {failed}, за {time.monotonic() - started:.2f} с'
+        ))
+
+    def process(self, recipe_id, image_name):
+        try:
+            generate_renditions(recipe_id, image_name)
+        except Exception as error:
+            return recipe_id, error
+        finally:
+            connections.close_all()
+        return recipe_id, None
@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+import os
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from recipes.cache import INGREDIENTS_VERSION, bump_version
+from recipes.models import Ingredient
+
+DEFAULT_PATH = os.path.join(
+    settings.BASE_DIR, '..', 'data', 'ingredients.csv'
+)
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        for row in csv.reader(file):
+            if len(row) >= 2:
+                yield row[0], row[1]
+
+
+def read_json(path):
+    with open(path, encoding='utf-8') as file:
+        for row in json.load(file):
+            yield row['title'], row['dimension']
+
+
+READERS = {
+    '.csv': read_csv,
+    '.json': read_json,
+}
+
+
+class Command(BaseCommand):
+    help = 'Загружает ингредиенты из data/ingredients.csv или .json'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=DEFAULT_PATH)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Не использовать COPY даже на PostgreSQL',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        reader = READERS.get(os.path.splitext(path)[1].lower())
+        if reader is None:
+            raise CommandError('Поддерживаются только файлы .csv и .json')
+        if not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше 0')
+
+        started = time.monotonic()
+        rows = self.new_rows(reader(path))
+        use_copy = (
+            connection.vendor == 'postgresql' and not options['no_copy']
+        )
+        with transaction.atomic():
+            if use_copy:
+                created = self.copy(rows)
+            else:
+                created = self.bulk_create(rows, batch_size)
+        bump_version(INGREDIENTS_VERSION)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено ингредиентов: {created} за {elapsed:.2f} с '
+            f'({created / elapsed if elapsed else 0:.0f} строк/с)'
+        ))
+
+    def new_rows(self, rows):
+        seen = set(
+            Ingredient.objects.values_list('name', 'measurement_unit')
+        )
+        for name, measurement_unit in rows:
+            row = (name.strip(), measurement_unit.strip())
+            if row[0] and row not in seen:
+                seen.add(row)
+                yield row
+
+    def bulk_create(self, rows, batch_size):
+        created = 0
+        while True:
+            batch = [
+                Ingredient(name=name, measurement_unit=measurement_unit)
+                for name, measurement_unit in islice(rows, batch_size)
+            ]
+            if not batch:
+                return created
+            Ingredient.objects.bulk_create(batch)
+            created += len(batch)
+
+    def copy(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        created = 0
+        for row in rows:
+            writer.writerow(row)
+            created += 1
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {Ingredient._meta.db_table} '
+                '(name, measurement_unit) FROM STDIN WITH CSV',
+                buffer,
+            )
+        return created
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.popular import rebuild_popular
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рейтинг популярных рецептов по недавним '
+            'добавлениям в избранное и список покупок')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = rebuild_popular()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан за {time.monotonic() - started:.2f} с, '
+            f'записей: {count}'
+        ))
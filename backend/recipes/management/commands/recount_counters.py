@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.counters import recount
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает счётчики избранного, рецептов и подписчиков '
+            'по данным таблиц')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        with transaction.atomic():
+            recount()
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики пересчитаны за {time.monotonic() - started:.2f} с'
+        ))
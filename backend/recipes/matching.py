@@ -0,0 +1,133 @@
+import threading
+from array import array
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from foodgram.db import read_from_primary
+
+from .cache import RECIPE_MATCH_VERSION, bump_version, get_version
+from .models import IngredientInRecipe, Recipe
+
+CHANGE_KEY = 'recipe-match:change:{}'
+
+
+def mark_recipe_changed(recipe_id):
+    def mark():
+        version = bump_version(RECIPE_MATCH_VERSION)
+        cache.set(
+            CHANGE_KEY.format(version), recipe_id,
+            settings.RECIPE_MATCH_CHANGES_TIMEOUT,
+        )
+    transaction.on_commit(mark)
+
+
+class RecipeMatchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = (None, {}, {})
+
+    def _rebuild(self, version):
+        recipes = {
+            id: (cooking_time, array('I'))
+            for id, cooking_time in Recipe.objects.values_list(
+                'id', 'cooking_time'
+            ).iterator()
+        }
+        postings = {}
+        for ingredient_id, recipe_id in IngredientInRecipe.objects.values_list(
+            'ingredient_id', 'recipe_id'
+        ).order_by('ingredient_id', 'recipe_id').iterator():
+            if recipe_id not in recipes:
+                continue
+            postings.setdefault(ingredient_id, array('I')).append(recipe_id)
+            recipes[recipe_id][1].append(ingredient_id)
+        self._snapshot = (version, postings, recipes)
+
+    def _apply_changes(self, version, recipe_ids):
+        _, postings, recipes = self._snapshot
+        postings = dict(postings)
+        recipes = dict(recipes)
+        touched = set()
+
+        for recipe_id in recipe_ids:
+            if recipe_id in recipes:
+                touched.update(recipes.pop(recipe_id)[1])
+        for id, cooking_time in Recipe.objects.filter(
+            id__in=recipe_ids
+        ).values_list('id', 'cooking_time'):
+            recipes[id] = (cooking_time, array('I'))
+        for ingredient_id, recipe_id in IngredientInRecipe.objects.filter(
+            recipe_id__in=recipe_ids
+        ).values_list('ingredient_id', 'recipe_id'):
+            if recipe_id not in recipes:
+                continue
+            recipes[recipe_id][1].append(ingredient_id)
+            touched.add(ingredient_id)
+
+        for ingredient_id in touched:
+            posting = {
+                recipe_id for recipe_id in postings.get(ingredient_id, ())
+                if recipe_id not in recipe_ids
+            }
+            posting.update(
+                recipe_id for recipe_id in recipe_ids
+                if recipe_id in recipes
+                and ingredient_id in recipes[recipe_id][1]
+            )
+            if posting:
+                postings[ingredient_id] = array('I', sorted(posting))
+            else:
+                postings.pop(ingredient_id, None)
+        self._snapshot = (version, postings, recipes)
+
+    def _changed_recipes(self, old_version, version):
+        if old_version is None or not 0 < version - old_version <= (
+            settings.RECIPE_MATCH_MAX_CHANGES
+        ):
+            return None
+        keys = [
+            CHANGE_KEY.format(number)
+            for number in range(old_version + 1, version + 1)
+        ]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            return None
+        return set(changes.values())
+
+    def get_snapshot(self):
+        version = get_version(RECIPE_MATCH_VERSION)
+        if self._snapshot[0] != version:
+            with self._lock, read_from_primary():
+                old_version = self._snapshot[0]
+                if old_version != version:
+                    changed = self._changed_recipes(old_version, version)
+                    if changed is None:
+                        self._rebuild(version)
+                    else:
+                        self._apply_changes(version, changed)
+        return self._snapshot
+
+    def match(self, ingredient_ids):
+        _, postings, recipes = self.get_snapshot()
+        matched = Counter()
+        for ingredient_id in set(ingredient_ids):
+            matched.update(postings.get(ingredient_id, ()))
+
+        results = []
+        for recipe_id, count in matched.items():
+            cooking_time, ingredients = recipes[recipe_id]
+            results.append((recipe_id, count, len(ingredients) - count,
+                            cooking_time, len(ingredients)))
+        results.sort(key=lambda result: (
+            -result[1] / result[4], result[2], result[3], result[0]
+        ))
+        return [
+            {'id': recipe_id, 'matched': count, 'missing': missing}
+            for recipe_id, count, missing, _, _ in results
+        ]
+
+
+recipe_match_index = RecipeMatchIndex()
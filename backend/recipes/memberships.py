@@ -0,0 +1,57 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from foodgram.db import read_from_primary
+
+from .cache import is_cache_shared
+from .models import Favorites, Follow, Purchase
+
+MEMBERSHIPS_KEY = 'memberships:{}'
+
+Memberships = namedtuple(
+    'Memberships', ('favorites', 'shopping_cart', 'subscriptions')
+)
+EMPTY_MEMBERSHIPS = Memberships(frozenset(), frozenset(), frozenset())
+
+
+def query_memberships(user):
+    with read_from_primary():
+        return Memberships(
+            frozenset(Favorites.objects.filter(
+                user=user
+            ).values_list('recipe_id', flat=True)),
+            frozenset(Purchase.objects.filter(
+                user=user
+            ).values_list('recipe_id', flat=True)),
+            frozenset(Follow.objects.filter(
+                user=user
+            ).values_list('author_id', flat=True)),
+        )
+
+
+def load_memberships(user):
+    if not is_cache_shared():
+        return query_memberships(user)
+    key = MEMBERSHIPS_KEY.format(user.pk)
+    memberships = cache.get(key)
+    if memberships is None:
+        memberships = query_memberships(user)
+        cache.set(key, memberships, settings.MEMBERSHIPS_CACHE_TIMEOUT)
+    return memberships
+
+
+def get_memberships(request):
+    if request is None or request.user.is_anonymous:
+        return EMPTY_MEMBERSHIPS
+    if not hasattr(request, '_memberships'):
+        request._memberships = load_memberships(request.user)
+    return request._memberships
+
+
+def invalidate_memberships(user_id):
+    transaction.on_commit(
+        lambda: cache.delete(MEMBERSHIPS_KEY.format(user_id))
+    )
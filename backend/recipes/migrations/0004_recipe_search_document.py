@@ -0,0 +1,53 @@
+# Generated by Django 3.0.5 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+SEARCH_INDEX = (
+    'CREATE INDEX IF NOT EXISTS recipe_search_idx ON recipes_recipe '
+    "USING gin ((setweight(to_tsvector('russian'::regconfig, "
+    "COALESCE(name, '')), 'A') || setweight(to_tsvector("
+    "'russian'::regconfig, COALESCE(search_document, '')), 'B')))"
+)
+
+
+def fill_search_documents(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    IngredientInRecipe = apps.get_model('recipes', 'IngredientInRecipe')
+    ingredient_names = {}
+    for recipe_id, name in IngredientInRecipe.objects.values_list(
+        'recipe_id', 'ingredient__name'
+    ).iterator():
+        ingredient_names.setdefault(recipe_id, []).append(name)
+    for recipe in Recipe.objects.only('id', 'name', 'text').iterator():
+        Recipe.objects.filter(pk=recipe.pk).update(search_document=' '.join(
+            (recipe.name, recipe.text, *ingredient_names.get(recipe.pk, ()))
+        ).casefold())
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(SEARCH_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS recipe_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Поисковый документ'),
+        ),
+        migrations.RunPython(
+            fill_search_documents, migrations.RunPython.noop
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,80 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from foodgram.db import read_from_primary
+
+from .cache import get_versions
+
+
+class AnonymousCacheMixin:
+    cache_versions = ()
+
+    def get_cache_versions(self):
+        return self.cache_versions
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cache_key(self, request):
+        params = sorted(
+            (key, sorted(values))
+            for key, values in request.query_params.lists()
+        )
+        versions = get_versions(self.get_cache_versions())
+        return hashlib.md5(
+            f'{request.path}:{params}:{request.accepted_renderer.format}:'
+            f'{versions}'.encode()
+        ).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not request.user.is_anonymous:
+            return handler(request, *args, **kwargs)
+
+        key = self.get_cache_key(request)
+        etag = f'"{key}"'
+        cached = cache.get('response:' + key)
+        if cached is None:
+            with read_from_primary():
+                response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cached = (response.data, int(time.time()))
+            cache.set(
+                'response:' + key, cached, settings.RESPONSE_CACHE_TIMEOUT
+            )
+        data, last_modified = cached
+
+        if self.is_not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def is_not_modified(self, request, etag, last_modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            return etag in (
+                value.strip() for value in if_none_match.split(',')
+            ) or if_none_match.strip() == '*'
+        if_modified_since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE', '')
+        )
+        return (
+            if_modified_since is not None
+            and last_modified <= if_modified_since
+        )
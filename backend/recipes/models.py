@@ -54,6 +54,7 @@ class Recipe(models.Model):
         verbose_name='Автор',
         on_delete=models.CASCADE,
         related_name='recipes',
+        db_index=False,
     )
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -69,6 +70,11 @@ class Recipe(models.Model):
         verbose_name='Изображение',
         upload_to='recipes/',
     )
+    renditions_ready = models.BooleanField(
+        verbose_name='Превью готовы',
+        default=False,
+        editable=False,
+    )
     name = models.CharField(
         verbose_name='Название',
         max_length=200,
@@ -84,11 +90,31 @@ class Recipe(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации',
     )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='В избранном',
+        default=0,
+        editable=False,
+    )
+    search_document = models.TextField(
+        verbose_name='Поисковый документ',
+        blank=True,
+        default='',
+        editable=False,
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='recipe_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='recipe_author_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -100,6 +126,7 @@ class IngredientInRecipe(models.Model):
         on_delete=models.CASCADE,
         verbose_name='Ингредиент',
         related_name='ingredients_amounts',
+        db_index=False,
     )
     recipe = models.ForeignKey(
         Recipe,
@@ -113,7 +140,6 @@ class IngredientInRecipe(models.Model):
     class Meta:
         verbose_name = 'Количество ингредиента'
         verbose_name_plural = 'Количество ингредиентов'
-        unique_together = ('ingredient', 'recipe')
         constraints = [
             models.UniqueConstraint(
                 fields=['ingredient', 'recipe'],
@@ -200,6 +226,11 @@ class Purchase(models.Model):
         ordering = ('-date_added',)
         verbose_name = 'Покупка'
         verbose_name_plural = 'Покупки'
+        indexes = [
+            models.Index(
+                fields=['user', '-date_added'], name='purchase_user_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['user', 'recipe'], name='purchase_user_recipe_unique'
@@ -208,3 +239,38 @@ class Purchase(models.Model):
 
     def __str__(self):
         return f'Рецепт {self.recipe} в списке покупок {self.user}'
+
+
+class PopularRecipe(models.Model):
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='popular_recipes',
+        verbose_name='Тег',
+        null=True,
+        blank=True,
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='popularity',
+        verbose_name='Рецепт',
+        db_index=False,
+    )
+    score = models.FloatField(
+        verbose_name='Рейтинг',
+    )
+    rank = models.PositiveIntegerField(
+        verbose_name='Место',
+    )
+
+    class Meta:
+        ordering = ('tag', 'rank')
+        verbose_name = 'Популярный рецепт'
+        verbose_name_plural = 'Популярные рецепты'
+        indexes = [
+            models.Index(fields=['tag', 'rank'], name='popular_tag_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.rank}. {self.recipe_id}'
@@ -0,0 +1,33 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import JSONParser, MultiPartParser
+
+
+class RequestTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Слишком большой запрос.'
+    default_code = 'request_too_large'
+
+
+class ContentLengthLimitMixin:
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > settings.RECIPE_REQUEST_MAX_BYTES:
+            raise RequestTooLarge(
+                'Размер запроса превышает '
+                f'{settings.RECIPE_REQUEST_MAX_BYTES} байт.'
+            )
+        return super().parse(stream, media_type, parser_context)
+
+
+class RecipeJSONParser(ContentLengthLimitMixin, JSONParser):
+    pass
+
+
+class RecipeMultiPartParser(ContentLengthLimitMixin, MultiPartParser):
+    pass
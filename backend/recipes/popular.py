@@ -0,0 +1,99 @@
+import heapq
+import logging
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .cache import POPULAR_VERSION, bump_versions_on_commit
+from .models import Favorites, PopularRecipe, Purchase, Recipe
+
+logger = logging.getLogger(__name__)
+
+REFRESH_KEY = 'popular:refresh'
+
+
+def get_scores(now):
+    since = now - timedelta(days=settings.POPULAR_WINDOW_DAYS)
+    decay = math.log(2) / (settings.POPULAR_HALF_LIFE_HOURS * 3600)
+    scores = {}
+    for model in (Favorites, Purchase):
+        events = model.objects.filter(date_added__gte=since).values(
+            'recipe_id', hour=TruncHour('date_added')
+        ).annotate(events=Count('id')).order_by()
+        for row in events.iterator():
+            age = (now - row['hour']).total_seconds() - 1800
+            score = row['events'] * math.exp(-decay * max(age, 0))
+            scores[row['recipe_id']] = scores.get(row['recipe_id'], 0) + score
+    return scores
+
+
+def get_rankings(scores):
+    rankings = {None: scores}
+    for recipe_id, tag_id in Recipe.tags.through.objects.values_list(
+        'recipe_id', 'tag_id'
+    ).iterator():
+        if recipe_id in scores:
+            rankings.setdefault(tag_id, {})[recipe_id] = scores[recipe_id]
+    return rankings
+
+
+def rebuild_popular(now=None):
+    scores = get_scores(now or timezone.now())
+    rows = []
+    for tag_id, tag_scores in get_rankings(scores).items():
+        top = heapq.nlargest(
+            settings.POPULAR_RECIPES_LIMIT,
+            tag_scores.items(),
+            key=lambda item: (item[1], item[0]),
+        )
+        rows.extend(
+            PopularRecipe(
+                tag_id=tag_id, recipe_id=recipe_id, score=score, rank=rank
+            )
+            for rank, (recipe_id, score) in enumerate(top, 1)
+        )
+
+    with transaction.atomic():
+        PopularRecipe.objects.all().delete()
+        PopularRecipe.objects.bulk_create(rows)
+        bump_versions_on_commit(POPULAR_VERSION)
+    return len(rows)
+
+
+class PopularRefresher:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def ensure_started(self):
+        if not settings.POPULAR_REFRESH_INTERVAL or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='popular-refresher', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        interval = settings.POPULAR_REFRESH_INTERVAL
+        while True:
+            if cache.add(REFRESH_KEY, time.time(), interval):
+                try:
+                    rebuild_popular()
+                except DatabaseError:
+                    logger.exception('Не удалось обновить популярные рецепты')
+                finally:
+                    connections.close_all()
+            time.sleep(interval)
+
+
+popular_refresher = PopularRefresher()
@@ -0,0 +1,53 @@
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connections
+from django.db.models import F, Value
+from django.db.models.functions import StrIndex
+
+from .models import Ingredient, Recipe
+
+SEARCH_CONFIG = 'russian'
+
+
+def build_search_document(name, text, ingredient_names):
+    return ' '.join((name, text, *ingredient_names)).casefold()
+
+
+def update_search_document(recipe):
+    ingredient_names = Ingredient.objects.filter(
+        ingredients_amounts__recipe=recipe
+    ).values_list('name', flat=True)
+    recipe.search_document = build_search_document(
+        recipe.name, recipe.text, ingredient_names
+    )
+    Recipe.objects.filter(pk=recipe.pk).update(
+        search_document=recipe.search_document
+    )
+
+
+def search_vector():
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('search_document', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def search_recipes(queryset, query):
+    if connections[queryset.db].vendor == 'postgresql':
+        search_query = SearchQuery(query, config=SEARCH_CONFIG)
+        return queryset.annotate(
+            search=search_vector()
+        ).filter(
+            search=search_query
+        ).annotate(
+            search_rank=SearchRank(F('search'), search_query)
+        ).order_by('-search_rank', '-pub_date')
+
+    terms = query.casefold().split()
+    if not terms:
+        return queryset
+    for term in terms:
+        queryset = queryset.filter(search_document__contains=term)
+    return queryset.annotate(
+        search_position=StrIndex('search_document', Value(terms[0]))
+    ).order_by('search_position', '-pub_date')
@@ -1,9 +1,16 @@
-from django.shortcuts import get_object_or_404
-from drf_extra_fields.fields import Base64ImageField
+import json
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
 
+from .fields import StreamingImageField
+from .images import rendition_urls, schedule_renditions
+from .memberships import get_memberships
 from .models import (Favorites, Follow, Ingredient, IngredientInRecipe,
                      Purchase, Recipe, Tag, User)
+from .search import update_search_document
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -12,13 +19,13 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('email', 'id', 'username', 'first_name', 'last_name',
-                  'is_subscribed')
+                  'is_subscribed', 'recipes_count', 'followers_count')
 
     def get_is_subscribed(self, obj):
-        request = self.context.get('request')
-        if request is None or request.user.is_anonymous:
-            return False
-        return Follow.objects.filter(user=request.user, author=obj.id).exists()
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+        memberships = get_memberships(self.context.get('request'))
+        return obj.id in memberships.subscriptions
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -45,8 +52,24 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'amount', 'measurement_unit')
 
 
+class IngredientAmountSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    amount = serializers.IntegerField(
+        min_value=1,
+        error_messages={
+            'min_value': ('Убедитесь, что значение количества '
+                          'ингредиента больше 0'),
+        },
+    )
+
+
+class RecipeRelationsSerializer(serializers.Serializer):
+    tags = serializers.ListField(child=serializers.IntegerField())
+    ingredients = IngredientAmountSerializer(many=True)
+
+
 class RecipeSerializer(serializers.ModelSerializer):
-    image = Base64ImageField()
+    image = StreamingImageField()
     author = UserSerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
     ingredients = IngredientInRecipeSerializer(
@@ -55,132 +78,191 @@ class RecipeSerializer(serializers.ModelSerializer):
     )
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
         fields = ('id', 'tags', 'author', 'name', 'text',
-                  'image', 'ingredients', 'cooking_time',
-                  'is_favorited', 'is_in_shopping_cart')
+                  'image', 'renditions', 'ingredients', 'cooking_time',
+                  'is_favorited', 'is_in_shopping_cart', 'favorites_count')
+
+    def to_representation(self, instance):
+        prefetch_related_objects(
+            [instance],
+            'tags',
+            Prefetch(
+                'ingredients_amounts',
+                queryset=IngredientInRecipe.objects.select_related(
+                    'ingredient'
+                ),
+            ),
+        )
+        return super().to_representation(instance)
 
     def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        if request is None or request.user.is_anonymous:
-            return False
-        return Favorites.objects.filter(user=request.user,
-                                        recipe=obj).exists()
+        memberships = get_memberships(self.context.get('request'))
+        return obj.id in memberships.favorites
 
     def get_is_in_shopping_cart(self, obj):
-        request = self.context.get('request')
-        if request is None or request.user.is_anonymous:
-            return False
-        return Purchase.objects.filter(user=request.user,
-                                       recipe=obj).exists()
+        memberships = get_memberships(self.context.get('request'))
+        return obj.id in memberships.shopping_cart
+
+    def get_renditions(self, obj):
+        return rendition_urls(obj, self.context.get('request'))
+
+    def get_initial_list(self, name):
+        if hasattr(self.initial_data, 'getlist'):
+            values = self.initial_data.getlist(name)
+            if len(values) != 1 or not isinstance(values[0], str):
+                return values
+            try:
+                values = json.loads(values[0])
+            except ValueError:
+                return values
+            return values if isinstance(values, list) else [values]
+        return self.initial_data.get(name)
 
     def validate(self, data):
-        ingredients = self.initial_data.get('ingredients')
-        ingredients_set = set()
-        for ingredient in ingredients:
-            if int(ingredient.get('amount')) <= 0:
-                raise serializers.ValidationError(
-                    ('Убедитесь, что значение количества '
-                     'ингредиента больше 0')
-                )
-            id = ingredient.get('id')
-            if id in ingredients_set:
+        relations = RecipeRelationsSerializer(data={
+            'tags': self.get_initial_list('tags'),
+            'ingredients': self.get_initial_list('ingredients'),
+        })
+        relations.is_valid(raise_exception=True)
+
+        ingredients_amounts = {}
+        for ingredient in relations.validated_data['ingredients']:
+            if ingredient['id'] in ingredients_amounts:
                 raise serializers.ValidationError(
                     'Ингредиент в рецепте не должен повторяться.'
                 )
-            ingredients_set.add(id)
-        data['ingredients'] = ingredients
+            ingredients_amounts[ingredient['id']] = ingredient['amount']
+
+        existing_ingredients = set(Ingredient.objects.filter(
+            id__in=ingredients_amounts
+        ).values_list('id', flat=True))
+        if len(existing_ingredients) != len(ingredients_amounts):
+            raise serializers.ValidationError(
+                'Указан несуществующий ингредиент.'
+            )
+
+        tags_ids = set(relations.validated_data['tags'])
+        tags = list(Tag.objects.filter(id__in=tags_ids))
+        if len(tags) != len(tags_ids):
+            raise serializers.ValidationError('Указан несуществующий тег.')
+
+        data['ingredients'] = ingredients_amounts
+        data['tags'] = tags
 
         return data
 
+    @transaction.atomic
     def create(self, validated_data):
-        image = validated_data.pop('image')
         ingredients = validated_data.pop('ingredients')
-        recipe = Recipe.objects.create(image=image, **validated_data)
-        tags = self.initial_data.get('tags')
-
-        for tag_id in tags:
-            recipe.tags.add(get_object_or_404(Tag, pk=tag_id))
-
-        for ingredient in ingredients:
-            IngredientInRecipe.objects.create(
+        tags = validated_data.pop('tags')
+        recipe = Recipe.objects.create(**validated_data)
+        validated_data['image'].close()
+        recipe.tags.set(tags)
+        schedule_renditions(recipe)
+
+        IngredientInRecipe.objects.bulk_create(
+            IngredientInRecipe(
                 recipe=recipe,
-                ingredient_id=ingredient.get('id'),
-                amount=ingredient.get('amount')
+                ingredient_id=ingredient_id,
+                amount=amount,
             )
+            for ingredient_id, amount in ingredients.items()
+        )
+        update_search_document(recipe)
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        instance.tags.clear()
-        tags = self.initial_data.get('tags')
-
-        for tag_id in tags:
-            instance.tags.add(get_object_or_404(Tag, pk=tag_id))
-
-        IngredientInRecipe.objects.filter(recipe=instance).delete()
-        for ingredient in validated_data.get('ingredients'):
-            ingredients_amounts = IngredientInRecipe.objects.create(
+        instance.tags.set(validated_data.get('tags'))
+
+        ingredients = dict(validated_data.get('ingredients'))
+        changed_amounts = []
+        removed_amounts = []
+        for ingredient_amount in instance.ingredients_amounts.all():
+            amount = ingredients.pop(ingredient_amount.ingredient_id, None)
+            if amount is None:
+                removed_amounts.append(ingredient_amount.id)
+            elif amount != ingredient_amount.amount:
+                ingredient_amount.amount = amount
+                changed_amounts.append(ingredient_amount)
+
+        if removed_amounts:
+            IngredientInRecipe.objects.filter(id__in=removed_amounts).delete()
+        if changed_amounts:
+            IngredientInRecipe.objects.bulk_update(changed_amounts, ['amount'])
+        IngredientInRecipe.objects.bulk_create(
+            IngredientInRecipe(
                 recipe=instance,
-                ingredient_id=ingredient.get('id'),
-                amount=ingredient.get('amount')
+                ingredient_id=ingredient_id,
+                amount=amount,
             )
-            ingredients_amounts.save()
+            for ingredient_id, amount in ingredients.items()
+        )
 
-        if validated_data.get('image') is not None:
-            instance.image = validated_data.get('image')
+        image = validated_data.get('image')
+        if image is not None:
+            instance.image = image
+            instance.renditions_ready = False
         instance.name = validated_data.get('name')
         instance.text = validated_data.get('text')
         instance.cooking_time = validated_data.get('cooking_time')
         instance.save()
+        if image is not None:
+            image.close()
+            schedule_renditions(instance)
+        update_search_document(instance)
 
         return instance
 
 
 class FollowerRecipeSerializer(serializers.ModelSerializer):
+    renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'renditions', 'cooking_time')
 
+    def get_renditions(self, obj):
+        return rendition_urls(obj, self.context.get('request'))
 
-class FollowerSerializer(serializers.ModelSerializer):
-    id = serializers.ReadOnlyField(source='author.id')
-    email = serializers.ReadOnlyField(source='author.email')
-    username = serializers.ReadOnlyField(source='author.username')
-    first_name = serializers.ReadOnlyField(source='author.first_name')
-    last_name = serializers.ReadOnlyField(source='author.last_name')
-    is_subscribed = serializers.SerializerMethodField()
-    recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
 
-    class Meta:
-        model = User
-        fields = ('email', 'id', 'username', 'first_name', 'last_name',
-                  'is_subscribed', 'recipes', 'recipes_count')
+class FollowerSerializer(UserSerializer):
+    recipes = FollowerRecipeSerializer(many=True, read_only=True)
 
-    def get_is_subscribed(self, obj):
-        request = self.context.get('request')
-        if not request or request.user.is_anonymous:
-            return False
-        return Follow.objects.filter(
-            user=obj.user, author=obj.author
-        ).exists()
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ('recipes',)
+
+
+class SubscriptionsParamsSerializer(serializers.Serializer):
+    recipes_limit = serializers.IntegerField(
+        min_value=0,
+        max_value=settings.RECIPES_LIMIT_MAX,
+        default=settings.RECIPES_LIMIT_MAX,
+    )
 
-    def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit')
-        queryset = Recipe.objects.filter(author=obj.author)
-        if limit is not None:
-            queryset = Recipe.objects.filter(
-                author=obj.author
-            )[:int(limit)]
 
-        return FollowerRecipeSerializer(queryset, many=True).data
+class RecipeMatchParamsSerializer(serializers.Serializer):
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=settings.RECIPE_MATCH_MAX_INGREDIENTS,
+    )
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=settings.BULK_RECIPES_MAX,
+    )
 
-    def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj.author).count()
+    def validate_ids(self, ids):
+        return list(dict.fromkeys(ids))
 
 
 class FollowSerializer(serializers.ModelSerializer):
@@ -0,0 +1,118 @@
+import csv
+import json
+
+from django.db.models import F, Sum
+
+from .models import IngredientInRecipe
+
+UNITS = {
+    'г': ('г', 1),
+    'кг': ('г', 1000),
+    'мл': ('мл', 1),
+    'л': ('мл', 1000),
+    'ч. л.': ('мл', 5),
+    'ст. л.': ('мл', 15),
+}
+UNIT_ALIASES = {
+    'г': 'г',
+    'гр': 'г',
+    'кг': 'кг',
+    'мл': 'мл',
+    'л': 'л',
+    'чл': 'ч. л.',
+    'стл': 'ст. л.',
+}
+
+SHOPPING_LIST_FORMATS = {
+    'txt': ('text/plain; charset=utf-8', 'shoplist.txt'),
+    'csv': ('text/csv; charset=utf-8', 'shoplist.csv'),
+    'json': ('application/json; charset=utf-8', 'shoplist.json'),
+}
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def get_shopping_list(user):
+    return IngredientInRecipe.objects.filter(
+        recipe__customers__user=user
+    ).values(
+        name=F('ingredient__name'),
+        measurement_unit=F('ingredient__measurement_unit'),
+    ).annotate(
+        total_amount=Sum('amount')
+    ).order_by()
+
+
+def normalize_unit(unit):
+    unit = ' '.join(unit.split())
+    key = unit.lower().replace('.', '').replace(' ', '')
+    return UNIT_ALIASES.get(key, unit)
+
+
+def merge_units(items):
+    groups = {}
+    for item in items:
+        unit = normalize_unit(item['measurement_unit'])
+        base_unit, factor = UNITS.get(unit, (unit, 1))
+        key = (item['name'], base_unit)
+        total, smallest_unit = groups.get(key, (0, unit))
+        if factor < UNITS.get(smallest_unit, (unit, 1))[1]:
+            smallest_unit = unit
+        groups[key] = (total + item['total_amount'] * factor, smallest_unit)
+
+    merged = []
+    for (name, base_unit), (total, unit) in groups.items():
+        factor = UNITS.get(unit, (unit, 1))[1]
+        if total % factor:
+            unit, factor = base_unit, 1
+        merged.append({
+            'name': name,
+            'measurement_unit': unit,
+            'total_amount': total // factor,
+        })
+    merged.sort(key=lambda item: (item['name'], item['measurement_unit']))
+    return merged
+
+
+def render_txt(items):
+    for item in items:
+        yield (f'{item["name"]} - {item["total_amount"]} '
+               f'{item["measurement_unit"]}\n')
+
+
+def render_csv(items):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(('name', 'amount', 'measurement_unit'))
+    for item in items:
+        yield writer.writerow(
+            (item['name'], item['total_amount'],
+             item['measurement_unit'])
+        )
+
+
+def render_json(items):
+    yield '['
+    separator = ''
+    for item in items:
+        yield separator + json.dumps({
+            'name': item['name'],
+            'amount': item['total_amount'],
+            'measurement_unit': item['measurement_unit'],
+        }, ensure_ascii=False)
+        separator = ','
+    yield ']'
+
+
+RENDERERS = {
+    'txt': render_txt,
+    'csv': render_csv,
+    'json': render_json,
+}
+
+
+def render_shopping_list(user, output_format):
+    items = merge_units(get_shopping_list(user).iterator())
+    return RENDERERS[output_format](items)
@@ -0,0 +1,113 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import (COUNTS_VERSION, INGREDIENTS_VERSION, RECIPE_VERSION,
+                    RECIPES_RELATED_VERSION, RECIPES_VERSION, TAGS_VERSION,
+                    bump_versions_on_commit)
+from .counters import change_author_count, change_favorites_count
+from .matching import mark_recipe_changed
+from .memberships import invalidate_memberships
+from .models import (Favorites, Follow, Ingredient, IngredientInRecipe,
+                     Purchase, Recipe, Tag, User)
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+def invalidate_ingredients(**kwargs):
+    bump_versions_on_commit(
+        INGREDIENTS_VERSION, RECIPES_VERSION, RECIPES_RELATED_VERSION
+    )
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tags(**kwargs):
+    bump_versions_on_commit(
+        TAGS_VERSION, RECIPES_VERSION, RECIPES_RELATED_VERSION
+    )
+
+
+@receiver([post_save, post_delete], sender=Recipe)
+def invalidate_recipe(instance, **kwargs):
+    bump_versions_on_commit(
+        COUNTS_VERSION, RECIPES_VERSION, RECIPE_VERSION.format(instance.pk)
+    )
+    mark_recipe_changed(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=IngredientInRecipe)
+def invalidate_recipe_ingredients(instance, **kwargs):
+    bump_versions_on_commit(
+        RECIPES_VERSION, RECIPE_VERSION.format(instance.recipe_id)
+    )
+    mark_recipe_changed(instance.recipe_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_tags(instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    versions = [COUNTS_VERSION, RECIPES_VERSION]
+    if not reverse:
+        versions.append(RECIPE_VERSION.format(instance.pk))
+    elif pk_set is None:
+        versions.append(RECIPES_RELATED_VERSION)
+    else:
+        versions.extend(RECIPE_VERSION.format(pk) for pk in pk_set)
+    bump_versions_on_commit(*versions)
+
+
+@receiver([post_save, post_delete], sender=Follow)
+@receiver([post_save, post_delete], sender=Favorites)
+@receiver([post_save, post_delete], sender=Purchase)
+def invalidate_user_relations(instance, **kwargs):
+    bump_versions_on_commit(COUNTS_VERSION)
+    invalidate_memberships(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user(created, update_fields, **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    versions = (RECIPES_VERSION, RECIPES_RELATED_VERSION)
+    if created:
+        versions += (COUNTS_VERSION,)
+    bump_versions_on_commit(*versions)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(**kwargs):
+    bump_versions_on_commit(
+        COUNTS_VERSION, RECIPES_VERSION, RECIPES_RELATED_VERSION
+    )
+
+
+@receiver(post_save, sender=Favorites)
+def increment_favorites_count(instance, created, **kwargs):
+    if created:
+        change_favorites_count([instance.recipe_id], 1)
+
+
+@receiver(post_delete, sender=Favorites)
+def decrement_favorites_count(instance, **kwargs):
+    change_favorites_count([instance.recipe_id], -1)
+
+
+@receiver(post_save, sender=Follow)
+def increment_followers_count(instance, created, **kwargs):
+    if created:
+        change_author_count(instance.author_id, 'followers_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def decrement_followers_count(instance, **kwargs):
+    change_author_count(instance.author_id, 'followers_count', -1)
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(instance, created, **kwargs):
+    if created:
+        change_author_count(instance.author_id, 'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(instance, **kwargs):
+    change_author_count(instance.author_id, 'recipes_count', -1)
@@ -0,0 +1,63 @@
+from recipes.models import Favorites, Purchase
+
+from .utils import RecipesAPITestCase
+
+
+class BulkRelationsTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(1)
+        self.recipes = [
+            self.create_recipe(self.user, f'Рецепт {i}') for i in range(10)
+        ]
+        self.ids = [recipe.id for recipe in self.recipes]
+        self.client = self.authenticated_client(self.user)
+
+    def favorites_counts(self):
+        for recipe in self.recipes:
+            recipe.refresh_from_db()
+        return [recipe.favorites_count for recipe in self.recipes]
+
+    def test_add_and_remove_favorites_keep_counts(self):
+        self.client.post(
+            '/api/recipes/favorite/bulk/', {'ids': self.ids}, format='json'
+        )
+        self.assertEqual(self.favorites_counts(), [1] * 10)
+
+        response = self.client.delete(
+            '/api/recipes/favorite/bulk/',
+            {'ids': self.ids[:2] + [self.ids[-1] + 100]}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['status'] for item in response.data],
+            ['removed', 'removed', 'not_found'],
+        )
+        self.assertEqual(self.favorites_counts(), [0, 0] + [1] * 8)
+        self.assertEqual(Favorites.objects.count(), 8)
+
+    def test_remove_favorites_query_count_does_not_grow(self):
+        self.client.post(
+            '/api/recipes/favorite/bulk/', {'ids': self.ids}, format='json'
+        )
+        for batch in (self.ids[:2], self.ids[2:]):
+            with self.assertNumQueries(5):
+                response = self.client.delete(
+                    '/api/recipes/favorite/bulk/', {'ids': batch},
+                    format='json',
+                )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.favorites_counts(), [0] * 10)
+
+    def test_clear_shopping_cart(self):
+        Purchase.objects.bulk_create(
+            Purchase(user=self.user, recipe=recipe) for recipe in self.recipes
+        )
+        response = self.client.delete('/api/recipes/shopping_cart/clear/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 10)
+        self.assertFalse(Purchase.objects.exists())
+        self.assertFalse(
+            self.client.get(f'/api/recipes/{self.ids[0]}/')
+            .data['is_in_shopping_cart']
+        )
@@ -0,0 +1,84 @@
+import base64
+import io
+import json
+
+from PIL import Image
+
+from recipes.models import Recipe
+
+from .utils import RecipesAPITestCase
+
+
+def png():
+    buffer = io.BytesIO()
+    Image.new('RGB', (2, 2)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class RecipeCreateTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self.authenticated_client(self.create_user(1))
+        self.tag = self.create_tag('breakfast')
+        self.ingredient = self.create_ingredients(1)[0]
+
+    def payload(self, **fields):
+        return {
+            'name': 'Омлет',
+            'text': 'Взбить яйца и обжарить.',
+            'cooking_time': 10,
+            'tags': [self.tag.id],
+            'ingredients': [{'id': self.ingredient.id, 'amount': 2}],
+            **fields,
+        }
+
+    def test_empty_image_is_rejected(self):
+        response = self.client.post(
+            '/api/recipes/', self.payload(image=''), format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('image', response.data)
+        self.assertFalse(Recipe.objects.exists())
+
+    def post(self, **fields):
+        return self.client.post(
+            '/api/recipes/', self.payload(**fields), format='json'
+        )
+
+    def test_create(self):
+        image = base64.b64encode(png()).decode()
+        response = self.post(image=f'data:image/png;base64,{image}')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['ingredients'][0]['amount'], 2)
+
+    def test_create_multipart(self):
+        response = self.client.post('/api/recipes/', {
+            **self.payload(),
+            'ingredients': json.dumps(self.payload()['ingredients']),
+            'image': io.BytesIO(png()),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def test_malformed_relations_are_rejected(self):
+        cases = {
+            'tags': [
+                {'tags': ['abc']},
+                {'tags': None},
+                {'tags': 'abc'},
+            ],
+            'ingredients': [
+                {'ingredients': None},
+                {'ingredients': [{'id': 'abc', 'amount': 1}]},
+                {'ingredients': [{'id': self.ingredient.id}]},
+                {'ingredients': [{'id': self.ingredient.id, 'amount': 0}]},
+                {'ingredients': ['abc']},
+            ],
+        }
+        image = base64.b64encode(png()).decode()
+        for field, payloads in cases.items():
+            for fields in payloads:
+                with self.subTest(fields=fields):
+                    response = self.post(image=image, **fields)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn(field, response.data)
+        self.assertFalse(Recipe.objects.exists())
@@ -0,0 +1,38 @@
+from rest_framework.test import APIClient
+
+from .utils import RecipesAPITestCase
+
+
+class RecipeTagFilterTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        author = self.create_user(1)
+        self.breakfast = self.create_tag('breakfast')
+        self.dinner = self.create_tag('dinner')
+        self.both = self.create_recipe(
+            author, 'Оба', tags=[self.breakfast, self.dinner]
+        )
+        self.breakfast_only = self.create_recipe(
+            author, 'Завтрак', tags=[self.breakfast]
+        )
+        self.create_recipe(author, 'Без тегов')
+
+    def get_ids(self, query):
+        response = APIClient().get(f'/api/recipes/?{query}')
+        self.assertEqual(response.status_code, 200, response.data)
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def test_any_mode_returns_each_recipe_once(self):
+        ids = self.get_ids('tags=breakfast&tags=dinner')
+        self.assertEqual(ids, [self.breakfast_only.id, self.both.id])
+
+    def test_all_mode(self):
+        self.assertEqual(
+            self.get_ids('tags=breakfast&tags=dinner&tags_mode=all'),
+            [self.both.id],
+        )
+
+    def test_unknown_slug_is_rejected(self):
+        response = APIClient().get('/api/recipes/?tags=unknown')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('tags', response.data)
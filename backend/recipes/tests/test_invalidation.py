@@ -0,0 +1,61 @@
+from rest_framework.test import APIClient
+
+from .utils import RecipesAPITransactionTestCase
+
+
+class CounterInvalidationTests(RecipesAPITransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user(1)
+        self.reader = self.create_user(2)
+        self.recipe = self.create_recipe(self.author, 'Рецепт')
+        self.client = self.authenticated_client(self.reader)
+        self.detail_url = f'/api/recipes/{self.recipe.id}/'
+
+    def get_anonymous(self, url):
+        response = APIClient().get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_favorite_refreshes_cached_favorites_count(self):
+        self.assertEqual(
+            self.get_anonymous(self.detail_url)['favorites_count'], 0
+        )
+        self.get_anonymous('/api/recipes/')
+        self.client.get(f'/api/recipes/{self.recipe.id}/favorite/')
+
+        self.assertEqual(
+            self.get_anonymous(self.detail_url)['favorites_count'], 1
+        )
+        self.assertEqual(
+            self.get_anonymous('/api/recipes/')['results'][0]
+            ['favorites_count'], 1,
+        )
+
+    def test_bulk_favorite_refreshes_cached_favorites_count(self):
+        self.get_anonymous(self.detail_url)
+        self.client.post(
+            '/api/recipes/favorite/bulk/', {'ids': [self.recipe.id]},
+            format='json',
+        )
+        self.assertEqual(
+            self.get_anonymous(self.detail_url)['favorites_count'], 1
+        )
+
+    def test_subscribe_refreshes_cached_followers_count(self):
+        other = self.create_recipe(self.author, 'Другой рецепт')
+        other_url = f'/api/recipes/{other.id}/'
+        self.get_anonymous(other_url)
+        self.client.get(f'/api/users/{self.author.id}/subscribe/')
+
+        self.assertEqual(
+            self.get_anonymous(other_url)['author']['followers_count'], 1
+        )
+
+    def test_new_recipe_refreshes_cached_recipes_count(self):
+        self.get_anonymous(self.detail_url)
+        self.create_recipe(self.author, 'Другой рецепт')
+
+        self.assertEqual(
+            self.get_anonymous(self.detail_url)['author']['recipes_count'], 2
+        )
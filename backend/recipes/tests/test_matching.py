@@ -0,0 +1,38 @@
+from unittest import mock
+
+from recipes.matching import RecipeMatchIndex
+from recipes.models import Recipe
+
+from .utils import RecipesAPITestCase
+
+
+class RecipeMatchIndexTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user(1)
+        self.ingredients = self.create_ingredients(2)
+        self.recipe = self.create_recipe(
+            self.author, 'Рецепт', ingredients=self.ingredients
+        )
+
+    def create_recipe_during_scan(self):
+        values_list = Recipe.objects.values_list
+
+        def scan(*fields):
+            result = list(values_list(*fields))
+            self.create_recipe(
+                self.author, 'Новый рецепт', ingredients=self.ingredients
+            )
+            return result
+        return mock.patch.object(
+            Recipe.objects, 'values_list',
+            side_effect=lambda *fields: mock.Mock(
+                iterator=lambda: iter(scan(*fields))
+            ),
+        )
+
+    def test_rebuild_skips_recipes_created_during_scan(self):
+        index = RecipeMatchIndex()
+        with self.create_recipe_during_scan():
+            matches = index.match([self.ingredients[0].id])
+        self.assertEqual([match['id'] for match in matches], [self.recipe.id])
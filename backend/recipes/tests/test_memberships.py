@@ -0,0 +1,15 @@
+from recipes.models import Favorites
+
+from .utils import RecipesAPITestCase
+
+
+class MembershipsTests(RecipesAPITestCase):
+    def test_local_cache_does_not_keep_memberships_between_requests(self):
+        user = self.create_user(1)
+        recipe = self.create_recipe(user, 'Рецепт')
+        client = self.authenticated_client(user)
+        url = f'/api/recipes/{recipe.id}/'
+
+        self.assertFalse(client.get(url).data['is_favorited'])
+        Favorites.objects.bulk_create([Favorites(user=user, recipe=recipe)])
+        self.assertTrue(client.get(url).data['is_favorited'])
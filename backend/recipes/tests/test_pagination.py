@@ -0,0 +1,59 @@
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import PopularRecipe
+
+from .utils import RecipesAPITestCase
+
+
+class ListActionPaginationTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        author = self.create_user(1)
+        self.ingredients = self.create_ingredients(2)
+        self.recipes = [
+            self.create_recipe(author, f'Рецепт {i}',
+                               ingredients=self.ingredients[:i % 2 + 1])
+            for i in range(3)
+        ]
+
+    def test_match_ignores_cursor_pagination(self):
+        ids = '&'.join(f'ingredients={item.id}' for item in self.ingredients)
+        for params in ('pagination=cursor', 'cursor=abc'):
+            response = APIClient().get(f'/api/recipes/match/?{ids}&{params}')
+            self.assertEqual(response.status_code, 200, params)
+            self.assertEqual(response.data['count'], 3)
+
+    @override_settings(POPULAR_REFRESH_INTERVAL=0)
+    def test_popular_ignores_cursor_pagination(self):
+        PopularRecipe.objects.bulk_create(
+            PopularRecipe(recipe=recipe, score=1, rank=rank)
+            for rank, recipe in enumerate(self.recipes, 1)
+        )
+        for params in ('pagination=cursor', 'cursor=abc'):
+            response = APIClient().get(f'/api/recipes/popular/?{params}')
+            self.assertEqual(response.status_code, 200, params)
+            self.assertEqual(
+                [recipe['id'] for recipe in response.data['results']],
+                [recipe.id for recipe in self.recipes],
+            )
+
+    def test_search_keeps_ranking_with_cursor_pagination(self):
+        author = self.recipes[0].author
+        first = self.create_recipe(author, 'Суп грибной')
+        self.create_recipe(author, 'Салат')
+        second = self.create_recipe(author, 'Пирог')
+        for recipe, document in ((first, 'суп грибной'),
+                                 (second, 'пирог с грибной начинкой')):
+            recipe.search_document = document
+            recipe.save(update_fields=['search_document'])
+
+        response = APIClient().get(
+            '/api/recipes/?search=грибной&pagination=cursor'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('count', response.data)
+        self.assertEqual(
+            [recipe['id'] for recipe in response.data['results']],
+            [first.id, second.id],
+        )
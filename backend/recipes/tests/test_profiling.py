@@ -0,0 +1,28 @@
+import re
+
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from .utils import RecipesAPITestCase
+
+METRIC_RE = re.compile(r'(\w+);dur=([\d.]+)')
+
+
+@override_settings(SQL_PROFILING=True)
+class SQLProfilingTests(RecipesAPITestCase):
+    def test_server_timing_splits_view_and_render(self):
+        author = self.create_user(1)
+        self.create_recipe(author, 'Рецепт')
+        with self.assertLogs('foodgram.middleware', 'INFO'):
+            response = APIClient().get('/api/recipes/')
+
+        metrics = {
+            name: float(duration) for name, duration
+            in METRIC_RE.findall(response['Server-Timing'])
+        }
+        self.assertEqual(set(metrics), {'db', 'view', 'render', 'total'})
+        self.assertGreater(metrics['view'], 0)
+        self.assertLessEqual(
+            metrics['db'] + metrics['view'] + metrics['render'],
+            metrics['total'] + 0.2,
+        )
@@ -0,0 +1,47 @@
+from rest_framework.test import APIClient
+
+from recipes.models import Favorites, Follow, Purchase
+
+from .utils import RecipesAPITestCase
+
+
+class RecipeQueryCountTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user(1)
+        self.reader = self.create_user(2)
+        tags = [self.create_tag(f'tag{i}') for i in range(3)]
+        ingredients = self.create_ingredients(5)
+        self.recipes = [
+            self.create_recipe(
+                self.author, f'Рецепт {i}',
+                tags=tags[:i % 3 + 1], ingredients=ingredients[:i % 5 + 1],
+            )
+            for i in range(10)
+        ]
+        for recipe in self.recipes[::2]:
+            Favorites.objects.create(user=self.reader, recipe=recipe)
+            Purchase.objects.create(user=self.reader, recipe=recipe)
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def assert_constant_per_page(self, client, expected):
+        for limit in (2, 8):
+            self.assertEqual(
+                self.count_queries(client, f'/api/recipes/?limit={limit}'),
+                expected,
+            )
+
+    def test_anonymous_list(self):
+        self.assert_constant_per_page(APIClient(), 5)
+
+    def test_authenticated_list(self):
+        self.assert_constant_per_page(
+            self.authenticated_client(self.reader), 8
+        )
+
+    def test_detail(self):
+        url = f'/api/recipes/{self.recipes[-1].id}/'
+        self.assertEqual(self.count_queries(APIClient(), url), 4)
+        self.assertEqual(
+            self.count_queries(self.authenticated_client(self.reader), url), 7
+        )
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.sqlite3 import base as sqlite3
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from foodgram.db import REPLICA, HealthCheckMixin, ReplicaRouter
+
+from .utils import RecipesAPITestCase
+
+
+@override_settings(DATABASES={
+    **settings.DATABASES, REPLICA: settings.DATABASES['default'],
+})
+class ReplicaRoutingTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(1)
+        self.create_recipe(self.user, 'Рецепт')
+
+    def routed_reads(self, client, url):
+        route = ReplicaRouter().db_for_read
+        routes = []
+
+        def db_for_read(model, **hints):
+            routes.append(route(model, **hints))
+            return None
+        with mock.patch.object(
+            ReplicaRouter, 'db_for_read', side_effect=db_for_read
+        ):
+            self.assertEqual(client.get(url).status_code, 200)
+        return set(routes)
+
+    def test_anonymous_cache_fill_reads_from_primary(self):
+        self.assertEqual(
+            self.routed_reads(APIClient(), '/api/recipes/'), {None}
+        )
+
+    def test_authenticated_list_reads_from_replica(self):
+        self.assertIn(
+            REPLICA,
+            self.routed_reads(
+                self.authenticated_client(self.user), '/api/recipes/'
+            ),
+        )
+
+
+class ConnectionHealthCheckTests(RecipesAPITestCase):
+    def test_cache_hit_issues_no_queries(self):
+        self.create_tag('breakfast')
+        client = APIClient()
+        client.get('/api/tags/')
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get('/api/tags/').status_code, 200)
+
+    def test_reused_connection_is_checked_once_before_first_query(self):
+        wrapper = type(
+            'DatabaseWrapper', (HealthCheckMixin, sqlite3.DatabaseWrapper), {}
+        )(connection.settings_dict, 'health-check')
+        wrapper.ensure_connection()
+        wrapper.health_check_pending = True
+
+        with mock.patch.object(
+            wrapper, 'is_usable', return_value=False
+        ) as is_usable, mock.patch.object(
+            wrapper, 'close', wraps=wrapper.close
+        ) as close:
+            for _ in range(2):
+                with wrapper.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+        is_usable.assert_called_once_with()
+        close.assert_called_once_with()
+        wrapper.close()
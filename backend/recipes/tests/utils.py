@@ -0,0 +1,76 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
+
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag, User
+
+
+class RecipesTestMixin:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_settings = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def create_user(self, number):
+        return User.objects.create_user(
+            f'user{number}@example.com', f'user{number}',
+            'Имя', 'Фамилия', 'password',
+        )
+
+    def create_tag(self, slug):
+        return Tag.objects.create(name=slug, color='#FFFFFF', slug=slug)
+
+    def create_recipe(self, author, name, tags=(), ingredients=()):
+        recipe = Recipe.objects.create(
+            author=author, name=name, text='Описание',
+            cooking_time=10, image='recipes/test.png',
+        )
+        recipe.tags.set(tags)
+        IngredientInRecipe.objects.bulk_create(
+            IngredientInRecipe(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in ingredients
+        )
+        return recipe
+
+    def create_ingredients(self, count):
+        return [
+            Ingredient.objects.create(name=f'ингредиент {i}',
+                                      measurement_unit='г')
+            for i in range(count)
+        ]
+
+    def authenticated_client(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def count_queries(self, client, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(context.captured_queries)
+
+
+class RecipesAPITestCase(RecipesTestMixin, APITestCase):
+    pass
+
+
+class RecipesAPITransactionTestCase(RecipesTestMixin, APITransactionTestCase):
+    pass
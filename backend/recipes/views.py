@@ -1,21 +1,36 @@
-from django.db.models import Exists, OuterRef
-from django.http.response import HttpResponse
+from django.conf import settings
+from django.db.models import BooleanField, OuterRef, Prefetch, Subquery, Value
+from django.http.response import StreamingHttpResponse
 from djoser.views import UserViewSet
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from foodgram.db import use_primary
+
+from .autocomplete import PREFIX, SEARCH_MODES, ingredient_index
+from .bulk import bulk_add, bulk_remove
+from .cache import (INGREDIENTS_VERSION, POPULAR_VERSION, RECIPE_VERSION,
+                    RECIPES_RELATED_VERSION, RECIPES_VERSION, TAGS_VERSION)
 from .filters import IngredientNameFilter, RecipeFilter
+from .matching import recipe_match_index
+from .mixins import AnonymousCacheMixin
 from .models import (Favorites, Follow, Ingredient, IngredientInRecipe,
-                     Purchase, Recipe, Tag, User)
-from .pagination import CustomPagination
+                     PopularRecipe, Purchase, Recipe, Tag, User)
+from .pagination import CustomPagination, KeysetPagination, RecipePagination
+from .parsers import RecipeJSONParser, RecipeMultiPartParser
 from .permissions import IsOwnerOrAdminOrReadOnly
+from .popular import popular_refresher
 from .serializers import (FavoritesSerializer, FollowerSerializer,
                           FollowSerializer, IngredientSerializer,
-                          PurchaseSerializer, RecipeSerializer, TagSerializer,
+                          PurchaseSerializer, RecipeIdsSerializer,
+                          RecipeMatchParamsSerializer, RecipeSerializer,
+                          SubscriptionsParamsSerializer, TagSerializer,
                           UserSerializer)
+from .shopping_list import SHOPPING_LIST_FORMATS, render_shopping_list
 
 
 class CustomUserViewSet(UserViewSet):
@@ -25,6 +40,7 @@ class CustomUserViewSet(UserViewSet):
     serializer_class = UserSerializer
 
     @action(detail=True, permission_classes=[IsAuthenticated])
+    @use_primary
     def subscribe(self, request, id=None):
         user = request.user
         author = get_object_or_404(User, id=id)
@@ -54,8 +70,20 @@ class CustomUserViewSet(UserViewSet):
 
     @action(detail=False, permission_classes=[IsAuthenticated])
     def subscriptions(self, request):
-        user = request.user
-        queryset = Follow.objects.filter(user=user)
+        params = SubscriptionsParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        recipes = Recipe.objects.filter(id__in=Subquery(
+            Recipe.objects.filter(
+                author_id=OuterRef('author_id')
+            ).values('id')[:params.validated_data['recipes_limit']]
+        ))
+        queryset = User.objects.filter(
+            following__user=request.user
+        ).annotate(
+            is_subscribed=Value(True, output_field=BooleanField()),
+        ).prefetch_related(
+            Prefetch('recipes', queryset=recipes)
+        ).order_by('-following__id')
         pages = self.paginate_queryset(queryset)
         serializer = FollowerSerializer(
             pages,
@@ -65,54 +93,150 @@ class CustomUserViewSet(UserViewSet):
         return self.get_paginated_response(serializer.data)
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(AnonymousCacheMixin, viewsets.ReadOnlyModelViewSet):
+    cache_versions = (TAGS_VERSION,)
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (AllowAny,)
     pagination_class = None
 
 
-class IngredientsViewSet(viewsets.ModelViewSet):
+class IngredientsViewSet(AnonymousCacheMixin, viewsets.ModelViewSet):
+    cache_versions = (INGREDIENTS_VERSION,)
     serializer_class = IngredientSerializer
     queryset = Ingredient.objects.all()
     pagination_class = None
     permission_classes = (AllowAny,)
     filterset_class = IngredientNameFilter
 
-
-class RecipeViewSet(viewsets.ModelViewSet):
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get('name'):
+            return super().list(request, *args, **kwargs)
+        return self.cached_response(self.search, request)
+
+    def search(self, request):
+        name = request.query_params.get('name')
+        mode = request.query_params.get('search', PREFIX)
+        if mode not in SEARCH_MODES:
+            raise ValidationError({
+                'search': f'Поддерживаемые режимы: {", ".join(SEARCH_MODES)}.'
+            })
+        ingredients = ingredient_index.search(name, mode)
+        measurement_unit = request.query_params.get('measurement_unit')
+        if measurement_unit:
+            ingredients = [
+                ingredient for ingredient in ingredients
+                if ingredient['measurement_unit'] == measurement_unit
+            ]
+
+        return Response(ingredients)
+
+
+class RecipeViewSet(AnonymousCacheMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
     permission_classes = (IsOwnerOrAdminOrReadOnly,)
-    pagination_class = CustomPagination
+    pagination_class = RecipePagination
+    parser_classes = (RecipeJSONParser, RecipeMultiPartParser)
     filter_class = RecipeFilter
 
     def perform_create(self, serializer):
         return serializer.save(author=self.request.user)
 
+    def get_cache_versions(self):
+        if self.action == 'retrieve':
+            return (
+                RECIPES_RELATED_VERSION,
+                RECIPE_VERSION.format(self.kwargs['pk']),
+            )
+        if self.action == 'popular':
+            return (POPULAR_VERSION, RECIPES_VERSION)
+        return (RECIPES_VERSION,)
+
     def get_queryset(self):
         user = self.request.user
+        queryset = Recipe.objects.select_related('author').prefetch_related(
+            'tags',
+            Prefetch(
+                'ingredients_amounts',
+                queryset=IngredientInRecipe.objects.select_related(
+                    'ingredient'
+                ),
+            ),
+        )
 
         if user.is_anonymous:
-            return Recipe.objects.all()
-
-        queryset = Recipe.objects.annotate(
-            is_favorited=Exists(Favorites.objects.filter(
-                user=user, recipe_id=OuterRef('pk')
-            )),
-            is_in_shopping_cart=Exists(Purchase.objects.filter(
-                user=user, recipe_id=OuterRef('pk')
-            ))
-        )
+            return queryset
 
         if self.request.GET.get('is_favorited'):
-            return queryset.filter(is_favorited=True)
+            return queryset.filter(id__in=Favorites.objects.filter(
+                user=user
+            ).values('recipe_id'))
         elif self.request.GET.get('is_in_shopping_cart'):
-            return queryset.filter(is_in_shopping_cart=True)
+            return queryset.filter(id__in=Purchase.objects.filter(
+                user=user
+            ).values('recipe_id'))
 
         return queryset
 
+    @action(detail=False, url_path='match')
+    def match(self, request):
+        params = RecipeMatchParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        matches = recipe_match_index.match(
+            params.validated_data['ingredients']
+        )
+        page = self.paginate_queryset(matches)
+        recipes = self.get_queryset().in_bulk(
+            [recipe_match['id'] for recipe_match in page]
+        )
+
+        results = []
+        for recipe_match in page:
+            recipe = recipes.get(recipe_match['id'])
+            if recipe is None:
+                continue
+            data = self.get_serializer(recipe).data
+            data['matched_ingredients'] = recipe_match['matched']
+            data['missing_ingredients'] = recipe_match['missing']
+            results.append(data)
+
+        return self.get_paginated_response(results)
+
+    @action(detail=False, permission_classes=[IsAuthenticated])
+    def feed(self, request):
+        authors = Follow.objects.filter(
+            user=request.user
+        ).order_by('-id').values('author_id')[:settings.FEED_AUTHORS_MAX]
+        queryset = self.get_queryset().filter(
+            author_id__in=Subquery(authors)
+        )
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False)
+    def popular(self, request):
+        popular_refresher.ensure_started()
+        return self.cached_response(self.get_popular, request)
+
+    def get_popular(self, request):
+        ranking = PopularRecipe.objects.filter(tag=None)
+        slug = request.query_params.get('tags')
+        if slug:
+            ranking = PopularRecipe.objects.filter(tag__slug=slug)
+        page = self.paginate_queryset(list(
+            ranking.order_by('rank').values_list('recipe_id', flat=True)
+        ))
+        recipes = self.get_queryset().in_bulk(page)
+        serializer = self.get_serializer(
+            [recipes[id] for id in page if id in recipes], many=True
+        )
+        return self.get_paginated_response(serializer.data)
+
     @action(detail=True, permission_classes=[IsAuthenticated])
+    @use_primary
     def favorite(self, request, pk=None):
         user = request.user
         recipe = get_object_or_404(Recipe, id=pk)
@@ -142,6 +266,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=True, permission_classes=[IsAuthenticated])
+    @use_primary
     def shopping_cart(self, request, pk=None):
         user = request.user
         recipe = get_object_or_404(Recipe, id=pk)
@@ -170,33 +295,56 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=['post', 'delete'],
+            url_path='favorite/bulk', permission_classes=[IsAuthenticated])
+    def bulk_favorite(self, request):
+        return self.bulk_relations(Favorites, request)
+
+    @action(detail=False, methods=['post', 'delete'],
+            url_path='shopping_cart/bulk',
+            permission_classes=[IsAuthenticated])
+    def bulk_shopping_cart(self, request):
+        return self.bulk_relations(Purchase, request)
+
+    @action(detail=False, methods=['delete'], url_path='shopping_cart/clear',
+            permission_classes=[IsAuthenticated])
+    def clear_shopping_cart(self, request):
+        outcomes = bulk_remove(Purchase, request.user)
+        return Response(self.bulk_response_data(outcomes))
+
+    def bulk_relations(self, model, request):
+        params = RecipeIdsSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        recipe_ids = params.validated_data['ids']
+        if request.method == 'POST':
+            outcomes = bulk_add(model, request.user, recipe_ids)
+        else:
+            outcomes = bulk_remove(model, request.user, recipe_ids)
+        return Response(self.bulk_response_data(outcomes))
+
+    def bulk_response_data(self, outcomes):
+        return [
+            {'id': id, 'status': outcome} for id, outcome in outcomes.items()
+        ]
+
+    def perform_content_negotiation(self, request, force=False):
+        if self.action == 'download_shopping_cart':
+            force = True
+        return super().perform_content_negotiation(request, force)
+
     @action(detail=False, permission_classes=[IsAuthenticated])
     def download_shopping_cart(self, request):
-        user = request.user
-        shopping_cart = user.purchases.all()
-        list = {}
-        for item in shopping_cart:
-            recipe = item.recipe
-            ingredients = IngredientInRecipe.objects.filter(recipe=recipe)
-            for ingredient in ingredients:
-                amount = ingredient.amount
-                name = ingredient.ingredient.name
-                measurement_unit = ingredient.ingredient.measurement_unit
-                if name not in list:
-                    list[name] = {
-                        'measurement_unit': measurement_unit,
-                        'amount': amount
-                    }
-                else:
-                    list[name]['amount'] = (
-                        list[name]['amount'] + amount
-                    )
-
-        shopping_list = []
-        for item in list:
-            shopping_list.append(f'{item} - {list[item]["amount"]} '
-                                 f'{list[item]["measurement_unit"]} \n')
-        response = HttpResponse(shopping_list, 'Content-Type: text/plain')
-        response['Content-Disposition'] = 'attachment; filename="shoplist.txt"'
+        output_format = request.query_params.get('format', 'txt')
+        if output_format not in SHOPPING_LIST_FORMATS:
+            raise ValidationError({
+                'format': 'Поддерживаемые форматы: '
+                          f'{", ".join(SHOPPING_LIST_FORMATS)}.'
+            })
+        content_type, filename = SHOPPING_LIST_FORMATS[output_format]
+        response = StreamingHttpResponse(
+            render_shopping_list(request.user, output_format),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
 
         return response